@@ -1,20 +1,83 @@
 import json
 import os
+import re
+import shutil
+import stat
+import sys
+import time
+from pathlib import Path
+from types import MappingProxyType
 from core.logger import Logger
 from core.version import APP_VERSION, GITHUB_REPO
 
+# 优先使用orjson（可选依赖）读写配置/历史JSON，未安装时回退到标准库（均以bytes读写）
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps(data):
+        return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+
+def atomic_write_json(path, data):
+    """将data编码后一次性写入临时文件并fsync，再用os.replace原子替换目标文件"""
+    payload = json_dumps(data)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# 仅Windows可用的模块
+if sys.platform == "win32":
+    import ctypes
+    import winreg
+    from ctypes import wintypes
+
 class ConfigManager:
     """配置管理器，用于保存和读取应用配置，统一管理所有程序目录"""
     
     DEFAULT_MANAGER_FOLDER = "DevEnvManager"
     
+    # 环境名称到apps下文件夹名称的映射（只读，_paths中的安装路径由它预先拼接）
+    ENV_FOLDER_MAP = MappingProxyType({
+        "JDK": "jdk",
+        "Node.js": "nodejs",
+        "Maven": "maven",
+        "Redis": "redis",
+        "Python": "python"
+    })
+    
+    # 程序目录下的旧版config.json已确认不存在（或已删除）后不再检查
+    _legacy_cwd_config_cleaned = False
+    
     def __init__(self):
         self.logger = Logger()
         # 先使用临时logger，避免循环依赖
         self._init_logger = None
         
+        # 默认管理文件夹路径（用户主目录下），多处使用，只计算一次
+        self._default_manager_folder_path = os.path.join(os.path.expanduser("~"), self.DEFAULT_MANAGER_FOLDER)
+        
+        # 缓存SystemConfig实例，所有读写环境变量的方法共用
+        try:
+            from core.system_config import SystemConfig
+            self._sys_config = SystemConfig()
+        except Exception:
+            self._sys_config = None
+        
         # 获取统一管理文件夹路径
         self.manager_folder_path = self._get_or_create_manager_folder()
+        self._refresh_paths()
         
         # 确保所有子目录存在
         self._ensure_directories()
@@ -22,35 +85,63 @@ class ConfigManager:
         # 启动时清理旧目录（如果存在）
         self._cleanup_old_directories_on_startup()
 
+        # 读取配置文件到内存（仅读取一次，后续访问直接使用缓存）
+        # 修改很少（每次运行至多几次），均立即写盘，不在退出时延迟写入，
+        # 避免各实例的旧缓存在退出时互相覆盖
+        self._config_cache = self._load_config()
+
         # 读取上次运行的版本号
         self.last_run_version = self._load_last_run_version()
     
+    def _refresh_paths(self):
+        """根据当前统一管理文件夹预先计算各子目录及文件路径"""
+        config_dir = os.path.join(self.manager_folder_path, "config")
+        apps_dir = os.path.join(self.manager_folder_path, "apps")
+        self._paths = {
+            "downloads": os.path.join(self.manager_folder_path, "downloads"),
+            "logs": os.path.join(self.manager_folder_path, "logs"),
+            "config": config_dir,
+            "apps": apps_dir,
+            "config_file": os.path.join(config_dir, "config.json"),
+            "history_file": os.path.join(config_dir, "installed.json"),
+            "manager_folder_name": os.path.basename(self.manager_folder_path),
+            # 各已知环境的安装路径
+            "env_install": {
+                env_name: os.path.join(apps_dir, folder_name)
+                for env_name, folder_name in self.ENV_FOLDER_MAP.items()
+            }
+        }
+
+    def _load_config(self):
+        """读取整个配置文件到内存，文件不存在或损坏时返回空字典"""
+        try:
+            data = json_loads(Path(self.get_config_file()).read_bytes())
+            if isinstance(data, dict):
+                return data
+        except Exception:
+            pass
+        return {}
+
     def _load_last_run_version(self):
-        """读取上次运行的版本号"""
-        config_file = self.get_config_file()
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get("last_run_version", "0.0.0")
-            except:
-                pass
-        return "0.0.0"
+        """读取上次运行的版本号（来自内存缓存）"""
+        return self._config_cache.get("last_run_version", "0.0.0")
 
     def get_last_run_version(self):
         return self.last_run_version
 
     def set_last_run_version(self, version):
+        # 版本号未变化时无需写盘
+        if version == self.last_run_version:
+            return
         self.last_run_version = version
+        # 立即写盘，异常退出时也不会丢失
         self._save_config()
 
     def _get_or_create_manager_folder(self):
         """获取或创建统一管理文件夹"""
         # 1. 优先从环境变量读取（最高优先级）
         try:
-            from core.system_config import SystemConfig
-            sys_config = SystemConfig()
-            env_path = sys_config.get_env_variable("DEVENVMANAGER_CONFIG")
+            env_path = self._sys_config.get_env_variable("DEVENVMANAGER_CONFIG")
             
             if env_path and env_path.strip():
                 path_normalized = os.path.normpath(env_path.strip())
@@ -62,36 +153,31 @@ class ConfigManager:
         
         # 2. 如果没有环境变量，使用默认路径（首次运行）
         # 默认路径：用户主目录下的DevEnvManager
-        default_path = os.path.join(os.path.expanduser("~"), self.DEFAULT_MANAGER_FOLDER)
+        default_path = self._default_manager_folder_path
         
-        # 确保目录存在（仅在不存在时创建）
-        if not os.path.exists(default_path):
-            try:
-                os.makedirs(default_path)
-            except Exception as e:
-                # 如果创建失败，使用程序目录
-                default_path = os.path.join(os.getcwd(), self.DEFAULT_MANAGER_FOLDER)
-                if not os.path.exists(default_path):
-                    os.makedirs(default_path)
+        # 确保目录存在（已存在时不报错）
+        try:
+            os.makedirs(default_path, exist_ok=True)
+        except Exception as e:
+            # 如果创建失败，使用程序目录
+            default_path = os.path.join(os.getcwd(), self.DEFAULT_MANAGER_FOLDER)
+            os.makedirs(default_path, exist_ok=True)
         
         return os.path.normpath(default_path)
     
     def _migrate_config(self, old_config_file, new_manager_path):
         """迁移旧配置文件到新位置"""
         try:
-            # 读取旧配置
-            with open(old_config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # 读取旧配置（一次性读取字节后解析）
+            data = json_loads(Path(old_config_file).read_bytes())
             
             # 确保新目录存在
             config_dir = os.path.join(new_manager_path, "config")
-            if not os.path.exists(config_dir):
-                os.makedirs(config_dir)
+            os.makedirs(config_dir, exist_ok=True)
             
             # 保存到新位置
             new_config_file = os.path.join(config_dir, "config.json")
-            with open(new_config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            Path(new_config_file).write_bytes(json_dumps(data))
             
             # 可选：删除旧配置文件（保留注释掉，以防万一）
             # os.remove(old_config_file)
@@ -106,13 +192,22 @@ class ConfigManager:
             self.get_config_dir(),
             self.get_apps_dir()  # apps目录用于安装环境
         ]
+        
+        # 一次扫描父目录获取已存在的子目录，避免逐个stat
+        try:
+            with os.scandir(self.manager_folder_path) as it:
+                existing = {entry.name for entry in it if entry.is_dir()}
+        except OSError:
+            existing = set()
+        
         for dir_path in dirs:
-            if not os.path.exists(dir_path):
-                try:
-                    os.makedirs(dir_path)
-                except Exception as e:
-                    if self._init_logger:
-                        self._init_logger.warning(f"Failed to create directory {dir_path}: {e}")
+            if os.path.basename(dir_path) in existing:
+                continue
+            try:
+                os.makedirs(dir_path, exist_ok=True)
+            except Exception as e:
+                if self._init_logger:
+                    self._init_logger.warning(f"Failed to create directory {dir_path}: {e}")
     
     def get_manager_folder_path(self):
         """获取统一管理文件夹的完整路径"""
@@ -139,36 +234,36 @@ class ConfigManager:
         if os.path.normpath(path) == os.path.normpath(old_path):
             return True, "路径未改变"
         
-        # 确保父目录存在
-        parent_dir = os.path.dirname(path)
-        if not os.path.exists(parent_dir):
-            try:
-                os.makedirs(parent_dir)
-            except Exception as e:
-                return False, f"无法创建父目录: {e}"
+        # 同一卷且新路径不存在时，直接整体重命名，跳过复制+删除流程
+        renamed = migrate_files and self._rename_manager_folder(old_path, path)
         
-        # 如果新路径不存在，创建它
-        if not os.path.exists(path):
+        if not renamed:
+            # 创建新路径（连同父目录，已存在时不报错）
             try:
-                os.makedirs(path)
+                os.makedirs(path, exist_ok=True)
             except Exception as e:
                 return False, f"无法创建目录: {e}"
-        
-        # 迁移文件
-        if migrate_files and os.path.exists(old_path) and old_path != path:
-            try:
-                migrate_result = self._migrate_all_files(old_path, path)
-                if not migrate_result[0]:
-                    return False, f"文件迁移失败: {migrate_result[1]}"
-            except Exception as e:
-                return False, f"文件迁移异常: {e}"
+            
+            # 迁移文件
+            if migrate_files and os.path.exists(old_path) and old_path != path:
+                try:
+                    migrate_result = self._migrate_all_files(old_path, path)
+                    if not migrate_result[0]:
+                        # 迁移前已关闭日志文件句柄，失败时按原路径恢复
+                        self._reinitialize_logger()
+                        return False, f"文件迁移失败: {migrate_result[1]}"
+                except Exception as e:
+                    self._reinitialize_logger()
+                    return False, f"文件迁移异常: {e}"
         
         # 更新环境变量
         try:
             env_update_result = self._update_environment_variables(old_path, path)
             if not env_update_result[0]:
+                self._reinitialize_logger()
                 return False, f"环境变量更新失败: {env_update_result[1]}"
         except Exception as e:
+            self._reinitialize_logger()
             return False, f"环境变量更新异常: {e}"
         
         # 更新历史记录
@@ -181,34 +276,46 @@ class ConfigManager:
         
         # 保存配置
         self.manager_folder_path = path
+        self._refresh_paths()
         
         # 保存到环境变量（最高优先级）
         try:
-            from core.system_config import SystemConfig
-            sys_config = SystemConfig()
-            sys_config.set_env_variable("DEVENVMANAGER_CONFIG", path)
+            self._sys_config.set_env_variable("DEVENVMANAGER_CONFIG", path)
         except Exception as e:
             pass
         
+        # 迁移路径必须立即持久化
         self._save_config()
         self._ensure_directories()
         
         # 删除旧位置的配置文件（程序目录下的config.json）
-        old_config_in_cwd = os.path.join(os.getcwd(), "config.json")
-        if os.path.exists(old_config_in_cwd):
+        if not ConfigManager._legacy_cwd_config_cleaned:
+            old_config_in_cwd = os.path.join(os.getcwd(), "config.json")
             try:
                 os.remove(old_config_in_cwd)
+                ConfigManager._legacy_cwd_config_cleaned = True
+            except FileNotFoundError:
+                ConfigManager._legacy_cwd_config_cleaned = True
             except Exception as e:
                 pass
         
-        # 重新初始化Logger以使用新路径
+        # 新路径和目录都已就绪，此时才重新初始化Logger（整个迁移过程只初始化一次）
         self._reinitialize_logger()
         
-        # 延迟再次尝试删除旧目录（确保所有文件句柄已释放）
-        import time
-        time.sleep(1.5)  # 等待1.5秒，确保文件句柄释放
+        # 整体重命名后原目录已不存在，无需再清理
+        if renamed:
+            return True, "迁移成功（快速重命名）"
         
-        final_removed = self._force_remove_directory(old_path)
+        # 立即尝试删除旧目录，仅在删除失败（文件句柄尚未释放）时指数退避重试
+        final_removed = False
+        backoff = 0.05
+        for attempt in range(4):
+            final_removed = self._force_remove_directory(old_path)
+            if final_removed:
+                break
+            if attempt < 3:
+                time.sleep(backoff)
+                backoff *= 2
         
         if final_removed:
             return True, "迁移成功，原目录已删除"
@@ -227,22 +334,39 @@ class ConfigManager:
                 else:
                     return True, f"迁移成功，但原目录无法立即删除（已复制到新位置）。\n请手动删除原目录: {old_path}\n或重启系统后自动删除。"
     
+    def _rename_manager_folder(self, old_path, new_path):
+        """同一卷上直接重命名整个统一管理文件夹
+        
+        Returns:
+            bool: 是否重命名成功（失败时由调用方退回到复制迁移）
+        """
+        try:
+            parent_dir = os.path.dirname(new_path)
+            if not os.path.isdir(old_path) or os.path.exists(new_path) or not os.path.isdir(parent_dir):
+                return False
+            
+            # 跨卷无法重命名
+            if os.stat(old_path).st_dev != os.stat(parent_dir).st_dev:
+                return False
+            
+            # 释放日志文件句柄，否则Windows上无法重命名包含已打开文件的目录
+            Logger().close_handlers()
+            
+            os.rename(old_path, new_path)
+            return True
+        except OSError:
+            return False
+    
     def _reinitialize_logger(self):
         """重新初始化Logger以使用新的日志路径"""
         try:
-            from core.logger import Logger
             logger_instance = Logger()
             
-            # 关闭所有文件处理器
-            for handler in logger_instance.logger.handlers[:]:
-                try:
-                    handler.close()
-                    logger_instance.logger.removeHandler(handler)
-                except:
-                    pass
+            # 停止后台写日志线程并关闭所有处理器
+            logger_instance.close_handlers()
             
-            # 重新初始化Logger（使用新路径）
-            logger_instance._initialize_logger()
+            # 重新初始化Logger（直接传入当前日志目录，无需再构造ConfigManager）
+            logger_instance._initialize_logger(logs_dir=self.get_logs_dir())
         except Exception as e:
             # 如果重新初始化失败，不影响主流程
             pass
@@ -250,9 +374,6 @@ class ConfigManager:
     def _migrate_all_files(self, old_path, new_path):
         """迁移所有文件从旧位置到新位置，处理正在使用的文件"""
         try:
-            import shutil
-            import time
-            
             # 先关闭Logger的文件句柄，避免日志文件被占用
             self._close_logger_handlers()
             
@@ -268,12 +389,14 @@ class ConfigManager:
                 if os.path.exists(old_dir):
                     # 如果新目录已存在，合并内容
                     if os.path.exists(new_dir):
-                        # 合并目录内容
-                        for item in os.listdir(old_dir):
-                            old_item = os.path.join(old_dir, item)
-                            new_item = os.path.join(new_dir, item)
+                        # 合并目录内容：按顶层条目整体移动，而不是逐个文件复制
+                        with os.scandir(old_dir) as it:
+                            entries = list(it)
+                        for entry in entries:
+                            old_item = entry.path
+                            new_item = os.path.join(new_dir, entry.name)
                             
-                            result = self._migrate_item(old_item, new_item, retries=3)
+                            result = self._move_item(old_item, new_item, retries=3)
                             if result == "failed":
                                 failed_files.append(old_item)
                             elif result == "skipped":
@@ -281,13 +404,13 @@ class ConfigManager:
                         
                         # 尝试删除旧目录（如果为空）
                         try:
-                            if not os.listdir(old_dir):
+                            if self._is_empty_dir(old_dir):
                                 os.rmdir(old_dir)
                         except:
                             pass  # 目录不为空或删除失败，保留
                     else:
-                        # 直接迁移整个目录
-                        result = self._migrate_item(old_dir, new_dir, retries=3)
+                        # 直接迁移整个目录（同一卷上仅需一次重命名）
+                        result = self._move_item(old_dir, new_dir, retries=3)
                         if result == "failed":
                             failed_files.append(old_dir)
                         elif result == "skipped":
@@ -295,12 +418,14 @@ class ConfigManager:
             
             # 强制删除旧目录及其所有内容（多次尝试确保删除）
             old_dir_removed = False
+            backoff = 0.05
             for attempt in range(3):
                 old_dir_removed = self._force_remove_directory(old_path)
                 if old_dir_removed:
                     break
-                import time
-                time.sleep(0.5)  # 等待后重试
+                if attempt < 2:
+                    time.sleep(backoff)  # 指数退避后重试
+                    backoff *= 2
             
             # 构建结果消息
             message_parts = ["文件迁移完成"]
@@ -323,6 +448,36 @@ class ConfigManager:
         except Exception as e:
             return False, str(e)
     
+    def _is_empty_dir(self, path):
+        """判断目录是否为空（只读取第一个条目，不构造完整列表）"""
+        with os.scandir(path) as it:
+            return next(it, None) is None
+    
+    def _move_item(self, old_item, new_item, retries=3):
+        """使用 shutil.move 整体迁移文件或目录，同一卷上只需一次重命名
+        
+        目标已存在或移动失败时退回到 _migrate_item 的复制+删除方式。
+        返回值与 _migrate_item 相同。
+        """
+        backoff = 0.05
+        for attempt in range(retries):
+            # 目标已存在时需要合并内容，不能直接移动（否则会移动到目标内部）
+            if os.path.exists(new_item):
+                break
+            try:
+                shutil.move(old_item, new_item)
+                return "success"
+            except PermissionError:
+                # 文件正在使用，指数退避后重试
+                if attempt < retries - 1:
+                    time.sleep(backoff)
+                    backoff *= 2
+                    continue
+            except Exception:
+                break
+        
+        return self._migrate_item(old_item, new_item, retries=1)
+    
     def _migrate_item(self, old_item, new_item, retries=3):
         """迁移单个文件或目录，处理文件占用问题
         
@@ -331,48 +486,17 @@ class ConfigManager:
             "skipped": 跳过（文件正在使用，但已复制）
             "failed": 失败
         """
-        import shutil
-        import time
-        
+        backoff = 0.05
         for attempt in range(retries):
             try:
                 if os.path.isdir(old_item):
-                    # 目录：先复制，再删除
-                    if os.path.exists(new_item):
-                        # 如果目标已存在，合并内容
-                        for sub_item in os.listdir(old_item):
-                            old_sub = os.path.join(old_item, sub_item)
-                            new_sub = os.path.join(new_item, sub_item)
-                            self._migrate_item(old_sub, new_sub, retries=1)
-                    else:
-                        shutil.copytree(old_item, new_item)
-                    
-                    # 尝试删除原目录
-                    try:
-                        if not os.listdir(old_item):
-                            os.rmdir(old_item)
-                        else:
-                            # 目录不为空，尝试删除其中的文件
-                            for sub_item in os.listdir(old_item):
-                                sub_path = os.path.join(old_item, sub_item)
-                                try:
-                                    if os.path.isdir(sub_path):
-                                        shutil.rmtree(sub_path)
-                                    else:
-                                        os.remove(sub_path)
-                                except:
-                                    pass
-                            # 再次尝试删除
-                            try:
-                                if not os.listdir(old_item):
-                                    os.rmdir(old_item)
-                            except:
-                                pass
-                    except:
-                        # 无法删除，但已复制，返回skipped
-                        return "skipped"
+                    # 目录：先复制（目标已存在时合并内容），再一次性删除原目录
+                    shutil.copytree(old_item, new_item, dirs_exist_ok=True, copy_function=shutil.copy2)
                     
-                    return "success"
+                    if self._force_remove_directory(old_item):
+                        return "success"
+                    # 无法删除，但已复制，返回skipped
+                    return "skipped"
                 else:
                     # 文件：先复制，再删除
                     if not os.path.exists(new_item):
@@ -385,18 +509,21 @@ class ConfigManager:
                     except PermissionError:
                         # 文件正在使用，但已复制，返回skipped
                         if attempt < retries - 1:
-                            time.sleep(0.5)  # 等待后重试
+                            time.sleep(backoff)  # 指数退避后重试
+                            backoff *= 2
                             continue
                         return "skipped"
                     except Exception as e:
                         if attempt < retries - 1:
-                            time.sleep(0.5)
+                            time.sleep(backoff)
+                            backoff *= 2
                             continue
                         return "failed"
             except PermissionError:
                 # 文件正在使用
                 if attempt < retries - 1:
-                    time.sleep(0.5)
+                    time.sleep(backoff)
+                    backoff *= 2
                     continue
                 # 尝试复制而不是移动
                 try:
@@ -407,159 +534,100 @@ class ConfigManager:
                     return "failed"
             except Exception as e:
                 if attempt < retries - 1:
-                    time.sleep(0.5)
+                    time.sleep(backoff)
+                    backoff *= 2
                     continue
                 return "failed"
         
         return "failed"
     
     def _force_remove_directory(self, dir_path):
-        """强制删除目录及其所有内容，处理文件占用问题"""
-        import shutil
-        import time
-        import stat
+        """强制删除目录及其所有内容，处理只读文件
         
+        只遍历一次目录树；仍被占用的文件会被跳过，由调用方负责退避重试。
+        """
         if not os.path.exists(dir_path):
             return True
         
-        try:
-            # 先尝试使用 rmtree 直接删除（最快的方法）
+        def remove_readonly(func, path, exc_info):
+            """去掉只读属性后重试一次，仍失败（文件被占用）则跳过"""
             try:
-                shutil.rmtree(dir_path, ignore_errors=False)
-                if not os.path.exists(dir_path):
-                    return True
-            except:
+                os.chmod(path, stat.S_IWRITE)
+                func(path)
+            except OSError:
                 pass
-            
-            # 如果直接删除失败，逐步删除
+        
+        try:
             if os.path.isdir(dir_path):
-                # 递归删除所有文件和子目录
-                def remove_readonly(func, path, exc_info):
-                    """处理只读文件的删除"""
-                    try:
-                        os.chmod(path, stat.S_IWRITE)
-                        func(path)
-                    except:
-                        pass
-                
-                # 使用自定义错误处理函数删除
-                try:
-                    shutil.rmtree(dir_path, onerror=remove_readonly)
-                    if not os.path.exists(dir_path):
-                        return True
-                except:
-                    pass
-                
-                # 如果还是失败，手动删除每个文件
-                try:
-                    items = list(os.listdir(dir_path))
-                    for item in items:
-                        item_path = os.path.join(dir_path, item)
-                        try:
-                            if os.path.isdir(item_path):
-                                shutil.rmtree(item_path, onerror=remove_readonly)
-                            else:
-                                try:
-                                    os.chmod(item_path, stat.S_IWRITE)
-                                    os.remove(item_path)
-                                except:
-                                    pass
-                        except:
-                            pass
-                    
-                    # 等待文件系统更新
-                    time.sleep(0.3)
-                    
-                    # 再次尝试删除目录
-                    try:
-                        if not os.listdir(dir_path):
-                            os.rmdir(dir_path)
-                            return True
-                        else:
-                            # 强制删除剩余文件
-                            remaining = list(os.listdir(dir_path))
-                            for item in remaining:
-                                item_path = os.path.join(dir_path, item)
-                                try:
-                                    if os.path.isdir(item_path):
-                                        shutil.rmtree(item_path, onerror=remove_readonly)
-                                    else:
-                                        os.chmod(item_path, stat.S_IWRITE)
-                                        os.remove(item_path)
-                                except:
-                                    pass
-                            
-                            # 最后尝试删除目录
-                            time.sleep(0.2)
-                            if not os.listdir(dir_path):
-                                os.rmdir(dir_path)
-                                return True
-                            else:
-                                # 使用 rmtree 最后一次尝试
-                                shutil.rmtree(dir_path, ignore_errors=True)
-                                result = not os.path.exists(dir_path)
-                                return result
-                    except Exception as e:
-                        # 最后尝试：使用 rmtree 强制删除
-                        shutil.rmtree(dir_path, ignore_errors=True)
-                        result = not os.path.exists(dir_path)
-                        return result
-                except Exception as e2:
-                    # 最后尝试：使用 rmtree 强制删除
-                    shutil.rmtree(dir_path, ignore_errors=True)
-                    return not os.path.exists(dir_path)
+                shutil.rmtree(dir_path, onerror=remove_readonly)
             else:
                 # 如果是文件，直接删除
-                try:
-                    os.chmod(dir_path, stat.S_IWRITE)
-                    os.remove(dir_path)
-                    return True
-                except:
-                    return False
-        except Exception as e:
-            # 最后的尝试：使用 rmtree 强制删除
-            try:
-                shutil.rmtree(dir_path, ignore_errors=True)
-                return not os.path.exists(dir_path)
-            except:
-                return False
+                os.chmod(dir_path, stat.S_IWRITE)
+                os.remove(dir_path)
+        except OSError:
+            pass
         
-        return False
+        return not os.path.exists(dir_path)
     
     def _delete_with_admin(self, dir_path):
-        """使用管理员权限删除目录（通过启动管理员CMD）"""
+        """使用管理员权限删除目录（通过ShellExecuteExW以runas直接启动CMD）"""
         try:
-            import subprocess
-            import sys
+            # 直接调用ShellExecuteExW，避免先后启动两个PowerShell进程
+            SEE_MASK_NOCLOSEPROCESS = 0x00000040
+            SEE_MASK_NOASYNC = 0x00000100
+            SW_HIDE = 0
+            WAIT_TIMEOUT_MS = 30000
+            
+            class SHELLEXECUTEINFOW(ctypes.Structure):
+                _fields_ = [
+                    ("cbSize", wintypes.DWORD),
+                    ("fMask", wintypes.ULONG),
+                    ("hwnd", wintypes.HWND),
+                    ("lpVerb", wintypes.LPCWSTR),
+                    ("lpFile", wintypes.LPCWSTR),
+                    ("lpParameters", wintypes.LPCWSTR),
+                    ("lpDirectory", wintypes.LPCWSTR),
+                    ("nShow", ctypes.c_int),
+                    ("hInstApp", wintypes.HINSTANCE),
+                    ("lpIDList", ctypes.c_void_p),
+                    ("lpClass", wintypes.LPCWSTR),
+                    ("hkeyClass", wintypes.HKEY),
+                    ("dwHotKey", wintypes.DWORD),
+                    ("hIconOrMonitor", wintypes.HANDLE),
+                    ("hProcess", wintypes.HANDLE),
+                ]
             
-            # 构建删除命令
-            # 使用PowerShell的Remove-Item命令，支持强制删除
-            ps_command = f'Remove-Item -Path "{dir_path}" -Recurse -Force -ErrorAction SilentlyContinue'
-            
-            # 使用PowerShell以管理员权限执行
             # 注意：这会弹出UAC提示
-            cmd = [
-                'powershell',
-                '-Command',
-                f'Start-Process powershell -ArgumentList "-Command", "{ps_command}" -Verb RunAs -Wait'
-            ]
-            
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                return not os.path.exists(dir_path)
-            except subprocess.TimeoutExpired:
-                return False
-            except Exception as e:
+            sei = SHELLEXECUTEINFOW()
+            sei.cbSize = ctypes.sizeof(sei)
+            sei.fMask = SEE_MASK_NOCLOSEPROCESS | SEE_MASK_NOASYNC
+            sei.lpVerb = "runas"
+            sei.lpFile = "cmd.exe"
+            sei.lpParameters = f'/c rmdir /s /q "{dir_path}"'
+            sei.nShow = SW_HIDE
+            
+            ShellExecuteEx = ctypes.windll.shell32.ShellExecuteExW
+            ShellExecuteEx.argtypes = [ctypes.POINTER(SHELLEXECUTEINFOW)]
+            ShellExecuteEx.restype = wintypes.BOOL
+            
+            # 用户拒绝UAC提示时返回False
+            if not ShellExecuteEx(ctypes.byref(sei)):
                 return False
+            
+            if sei.hProcess:
+                kernel32 = ctypes.windll.kernel32
+                kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+                kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+                kernel32.WaitForSingleObject(sei.hProcess, WAIT_TIMEOUT_MS)
+                kernel32.CloseHandle(sei.hProcess)
+            
+            return not os.path.exists(dir_path)
         except Exception as e:
             return False
     
     def _schedule_delete_on_reboot(self, dir_path):
         """使用Windows API在系统重启时删除目录"""
         try:
-            import ctypes
-            from ctypes import wintypes
-            
             # Windows API: MoveFileEx with MOVEFILE_DELAY_UNTIL_REBOOT
             MOVEFILE_DELAY_UNTIL_REBOOT = 0x4
             
@@ -580,96 +648,73 @@ class ConfigManager:
     def _cleanup_old_directories_on_startup(self):
         """程序启动时清理旧目录（如果存在且已迁移）"""
         try:
+            default_old_path = self._default_manager_folder_path
+            
+            # 从未迁移过（当前就是默认路径）时无需任何文件系统检查
+            if os.path.normcase(os.path.normpath(self.manager_folder_path)) == \
+                    os.path.normcase(os.path.normpath(default_old_path)):
+                return
+            
             # 读取配置文件，检查是否有待清理的旧目录
             config_file = self.get_config_file()
             if not os.path.exists(config_file):
                 return
             
-            # 检查默认位置的旧目录是否存在
-            default_old_path = os.path.join(os.path.expanduser("~"), self.DEFAULT_MANAGER_FOLDER)
-            current_path = self.manager_folder_path
-            
-            # 如果当前路径不是默认路径，且默认路径存在，尝试清理
-            if os.path.normpath(current_path) != os.path.normpath(default_old_path):
-                if os.path.exists(default_old_path):
-                    # 检查旧目录是否为空或只包含logs目录
-                    try:
-                        items = os.listdir(default_old_path)
-                        # 如果只有logs目录，尝试删除
-                        if len(items) == 1 and items[0] == "logs":
-                            logs_dir = os.path.join(default_old_path, "logs")
-                            if os.path.isdir(logs_dir):
-                                # 尝试删除logs目录
-                                import shutil
-                                try:
-                                    shutil.rmtree(logs_dir, ignore_errors=True)
-                                    # 如果logs删除成功，尝试删除父目录
-                                    if not os.path.exists(logs_dir):
-                                        try:
-                                            os.rmdir(default_old_path)
-                                        except:
-                                            pass
-                                except:
-                                    pass
-                        # 如果目录为空，直接删除
-                        elif len(items) == 0:
+            # 当前路径不是默认路径，如果默认路径存在，尝试清理
+            if os.path.exists(default_old_path):
+                # 检查旧目录是否为空或只包含logs目录
+                try:
+                    # 最多只需要读取前两个条目即可判断
+                    with os.scandir(default_old_path) as it:
+                        first = next(it, None)
+                        second = next(it, None) if first is not None else None
+                    # 如果只有logs目录，尝试删除
+                    if first is not None and second is None and first.name == "logs":
+                        logs_dir = first.path
+                        if first.is_dir():
+                            # 尝试删除logs目录
                             try:
-                                os.rmdir(default_old_path)
+                                shutil.rmtree(logs_dir, ignore_errors=True)
+                                # 如果logs删除成功，尝试删除父目录
+                                if not os.path.exists(logs_dir):
+                                    try:
+                                        os.rmdir(default_old_path)
+                                    except:
+                                        pass
                             except:
                                 pass
-                    except:
-                        pass
+                    # 如果目录为空，直接删除
+                    elif first is None:
+                        try:
+                            os.rmdir(default_old_path)
+                        except:
+                            pass
+                except:
+                    pass
         except Exception as e:
             # 清理失败不影响程序启动
             pass
     
     def _close_logger_handlers(self):
-        """关闭Logger的所有文件句柄，释放日志文件"""
+        """关闭Logger的所有文件句柄，释放日志文件（不重新初始化）"""
         try:
-            from core.logger import Logger
-            import logging
-            
-            logger_instance = Logger()
+            # 先写完队列中尚未落盘的日志，再关闭文件句柄
+            Logger().close_handlers()
             
-            # 关闭所有文件处理器，特别是文件处理器
-            handlers_to_remove = []
-            for handler in logger_instance.logger.handlers[:]:
-                try:
-                    # 如果是文件处理器，确保完全关闭
-                    if isinstance(handler, logging.FileHandler):
-                        handler.flush()  # 刷新缓冲区
-                        handler.close()  # 关闭文件句柄
-                    else:
-                        handler.close()
-                    handlers_to_remove.append(handler)
-                except:
-                    pass
-            
-            # 移除所有处理器
-            for handler in handlers_to_remove:
-                try:
-                    logger_instance.logger.removeHandler(handler)
-                except:
-                    pass
-            
-            # 强制刷新logger
-            logger_instance.logger.handlers = []
-            
-            # 等待文件系统更新
-            import time
-            time.sleep(0.3)
-            
-            # 重新初始化Logger（使用新路径）
-            logger_instance._initialize_logger()
+            # 不在这里重新初始化：此时manager_folder_path仍指向旧路径，
+            # 由set_manager_folder_path在切换路径后统一调用_reinitialize_logger
         except Exception as e:
             # 如果关闭失败，不影响迁移流程
             pass
     
     def _update_environment_variables(self, old_path, new_path):
-        """更新环境变量，将旧路径替换为新路径"""
+        """更新环境变量，将旧路径替换为新路径
+        
+        一次性打开并读取整个 HKCU\\Environment，在内存中计算所有替换，
+        只写回发生变化的值，最后统一广播一次环境变量变更。
+        """
         try:
-            from core.system_config import SystemConfig
-            sys_config = SystemConfig()
+            sys_config = self._sys_config
             
             # 环境变量映射
             env_var_map = {
@@ -681,55 +726,77 @@ class ConfigManager:
             }
             
             # 环境名称到文件夹名称的映射
-            env_folder_map = {
-                "JDK": "jdk",
-                "Node.js": "nodejs",
-                "Maven": "maven",
-                "Redis": "redis",
-                "Python": "python"
-            }
+            env_folder_map = self.ENV_FOLDER_MAP
             
             updated_vars = []
             
-            for env_name, var_names in env_var_map.items():
-                if not isinstance(var_names, list):
-                    var_names = [var_names]
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0,
+                                winreg.KEY_READ | winreg.KEY_WRITE) as key:
+                # 批量读取所有用户环境变量（注册表中的名称不区分大小写）
+                env_values = {}
+                index = 0
+                while True:
+                    try:
+                        name, value, type_ = winreg.EnumValue(key, index)
+                    except OSError:
+                        break
+                    env_values[name.upper()] = (name, value, type_)
+                    index += 1
                 
-                folder_name = env_folder_map.get(env_name)
-                if not folder_name:
-                    continue
-                    
-                old_env_path = os.path.join(old_path, "apps", folder_name)
-                new_env_path = os.path.join(new_path, "apps", folder_name)
+                path_entry = env_values.get("PATH")
+                current_path = path_entry[1] if path_entry else None
+                new_path_var = current_path
                 
-                for var_name in var_names:
-                    current_value = sys_config.get_env_variable(var_name)
+                for env_name, var_names in env_var_map.items():
+                    if not isinstance(var_names, list):
+                        var_names = [var_names]
                     
-                    if current_value:
-                        # 检查是否是旧路径下的环境
-                        current_normalized = os.path.normpath(current_value)
-                        old_env_normalized = os.path.normpath(old_env_path)
+                    folder_name = env_folder_map.get(env_name)
+                    if not folder_name:
+                        continue
                         
-                        # 如果环境变量指向旧路径，更新为新路径
-                        if current_normalized.startswith(old_env_normalized):
-                            # 计算相对路径
-                            if current_normalized == old_env_normalized:
-                                new_value = new_env_path
-                            else:
-                                # 保持相对结构
-                                try:
-                                    relative = os.path.relpath(current_normalized, old_env_normalized)
-                                    new_value = os.path.join(new_env_path, relative)
-                                except ValueError:
-                                    # 如果路径不在同一驱动器，使用新路径
-                                    new_value = new_env_path
-                            
-                            # 更新环境变量
-                            if sys_config.set_env_variable(var_name, new_value):
-                                updated_vars.append(f"{var_name}: {current_value} -> {new_value}")
+                    new_env_path = os.path.join(new_path, "apps", folder_name)
+                    # 旧路径只规范化一次（Windows路径不区分大小写，统一用normcase比较）
+                    old_env_normalized = os.path.normcase(os.path.normpath(os.path.join(old_path, "apps", folder_name)))
+                    old_env_len = len(old_env_normalized)
+                    
+                    for var_name in var_names:
+                        entry = env_values.get(var_name)
+                        current_value = entry[1] if entry else None
+                        
+                        if current_value:
+                            # 检查是否是旧路径下的环境
+                            current_normalized = os.path.normpath(current_value)
                             
-                            # 更新PATH中的相关路径
-                            self._update_path_in_path_var(sys_config, current_value, new_value)
+                            # 如果环境变量指向旧路径，更新为新路径
+                            if os.path.normcase(current_normalized).startswith(old_env_normalized):
+                                # 保持相对结构（直接截取前缀之后的部分，保留原有大小写）
+                                relative = current_normalized[old_env_len:].lstrip(os.sep)
+                                new_value = os.path.join(new_env_path, relative) if relative else new_env_path
+                                
+                                # 更新环境变量（保留原有的值类型）
+                                try:
+                                    winreg.SetValueEx(key, entry[0], 0, entry[2], new_value)
+                                    updated_vars.append(f"{var_name}: {current_value} -> {new_value}")
+                                except OSError as e:
+                                    if self._init_logger:
+                                        self._init_logger.warning(f"更新环境变量 {var_name} 失败: {e}")
+                                
+                                # 更新PATH中的相关路径（仅在内存中）
+                                if new_path_var:
+                                    new_path_var = self._update_path_in_path_var(new_path_var, current_value, new_value)
+                
+                # PATH有变化时只写回一次
+                if new_path_var != current_path:
+                    try:
+                        winreg.SetValueEx(key, path_entry[0], 0, path_entry[2], new_path_var)
+                    except OSError as e:
+                        new_path_var = current_path
+                        if self._init_logger:
+                            self._init_logger.warning(f"更新PATH失败: {e}")
+            
+            if updated_vars or new_path_var != current_path:
+                sys_config._notify_system_change()
             
             if updated_vars:
                 return True, f"已更新 {len(updated_vars)} 个环境变量"
@@ -738,62 +805,51 @@ class ConfigManager:
         except Exception as e:
             return False, str(e)
     
-    def _update_path_in_path_var(self, sys_config, old_path, new_path):
-        """更新PATH环境变量中的路径"""
-        try:
-            import winreg
-            current_path = sys_config.get_env_variable("PATH")
-            if not current_path:
-                return
-            
-            paths = [p.strip() for p in current_path.split(";") if p.strip()]
-            updated = False
-            
-            for i, path in enumerate(paths):
-                path_normalized = os.path.normpath(path)
-                old_path_normalized = os.path.normpath(old_path)
-                
-                # 如果PATH中的路径在旧路径下，更新为新路径
-                if path_normalized.startswith(old_path_normalized):
-                    try:
-                        relative = os.path.relpath(path_normalized, old_path_normalized)
-                        new_path_value = os.path.join(new_path, relative)
-                    except ValueError:
-                        # 如果路径不在同一驱动器，使用新路径
-                        new_path_value = new_path
-                    paths[i] = new_path_value
-                    updated = True
-            
-            if updated:
-                new_path_val = ";".join(paths)
-                try:
-                    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0, winreg.KEY_READ) as key:
-                        _, type_ = winreg.QueryValueEx(key, "PATH")
-                except:
-                    type_ = winreg.REG_EXPAND_SZ
-                
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Environment", 0, winreg.KEY_SET_VALUE) as key:
-                    winreg.SetValueEx(key, "PATH", 0, type_, new_path_val)
-                sys_config._notify_system_change()
-        except Exception as e:
-            if self._init_logger:
-                self._init_logger.warning(f"更新PATH失败: {e}")
+    def _update_path_in_path_var(self, current_path, old_path, new_path):
+        """将PATH字符串中位于旧路径下的条目替换为新路径，返回新的PATH字符串"""
+        # 旧路径只规范化一次
+        old_path_normalized = os.path.normcase(os.path.normpath(old_path))
+        old_path_len = len(old_path_normalized)
+        
+        def _replace(path):
+            # 如果PATH中的路径在旧路径下，更新为新路径
+            path_normalized = os.path.normpath(path)
+            if not os.path.normcase(path_normalized).startswith(old_path_normalized):
+                return path
+            relative = path_normalized[old_path_len:].lstrip(os.sep)
+            return os.path.join(new_path, relative) if relative else new_path
+        
+        paths = [p.strip() for p in current_path.split(";") if p.strip()]
+        new_paths = [_replace(p) for p in paths]
+        
+        # 没有条目被替换时直接返回原字符串，避免重新拼接并重写注册表
+        if new_paths == paths:
+            return current_path
+        return ";".join(new_paths)
     
     def _update_history_paths(self, old_path, new_path):
-        """更新历史记录文件中的路径"""
+        """更新历史记录文件中的路径（此时历史记录文件已位于新位置）"""
         try:
-            from core.history import HistoryManager
-            history_manager = HistoryManager()
-            records = history_manager.get_records()
+            # 直接读取新位置的历史文件，避免通过HistoryManager再创建指向旧路径的ConfigManager
+            history_file = os.path.join(new_path, "config", "installed.json")
+            if not os.path.exists(history_file):
+                return
+            records = json_loads(Path(history_file).read_bytes()).get("installed", [])
+            
+            # 旧路径前缀只编译一次：不区分大小写，且必须在路径分隔符或结尾处结束
+            old_prefix = re.compile(
+                "^" + re.escape(os.path.normpath(old_path)) + r"(?=[\\/]|$)", re.IGNORECASE
+            )
+            new_norm = os.path.normpath(new_path)
             
             updated = False
             for record in records:
                 record_path = record.get('path', '')
-                if record_path and os.path.normpath(record_path).startswith(os.path.normpath(old_path)):
-                    # 计算新路径
-                    relative = os.path.relpath(os.path.normpath(record_path), os.path.normpath(old_path))
-                    new_record_path = os.path.join(new_path, relative)
-                    
+                if not record_path:
+                    continue
+                # 用函数作为替换值，避免新路径中的反斜杠被当作转义
+                new_record_path, count = old_prefix.subn(lambda m: new_norm, os.path.normpath(record_path), count=1)
+                if count:
                     # 更新记录
                     record['path'] = new_record_path
                     updated = True
@@ -801,72 +857,66 @@ class ConfigManager:
             if updated:
                 # 保存更新后的记录
                 data = {"installed": records}
-                history_file = self.get_history_file()
-                with open(history_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
+                atomic_write_json(history_file, data)
         except Exception as e:
             if self._init_logger:
                 self._init_logger.warning(f"更新历史记录失败: {e}")
     
     def get_manager_folder_name(self):
         """获取统一管理文件夹名称（不含路径）"""
-        return os.path.basename(self.manager_folder_path)
+        return self._paths["manager_folder_name"]
     
     def get_downloads_dir(self):
         """获取下载目录路径"""
-        return os.path.join(self.manager_folder_path, "downloads")
+        return self._paths["downloads"]
     
     def get_logs_dir(self):
         """获取日志目录路径"""
-        return os.path.join(self.manager_folder_path, "logs")
+        return self._paths["logs"]
     
     def get_config_dir(self):
         """获取配置目录路径"""
-        return os.path.join(self.manager_folder_path, "config")
+        return self._paths["config"]
     
     def get_apps_dir(self):
         """获取apps目录路径（所有环境统一安装在此目录下）"""
-        return os.path.join(self.manager_folder_path, "apps")
+        return self._paths["apps"]
     
     def get_config_file(self):
         """获取配置文件路径"""
-        return os.path.join(self.get_config_dir(), "config.json")
+        return self._paths["config_file"]
     
     def get_history_file(self):
         """获取历史记录文件路径"""
-        return os.path.join(self.get_config_dir(), "installed.json")
+        return self._paths["history_file"]
     
     def get_env_install_path(self, env_name):
         """获取指定环境的安装路径（在统一管理文件夹下的apps目录中）"""
-        # 环境名称映射到文件夹名称
-        env_folder_map = {
-            "JDK": "jdk",
-            "Node.js": "nodejs",
-            "Maven": "maven",
-            "Redis": "redis",
-            "Python": "python"
-        }
-        folder_name = env_folder_map.get(env_name, env_name.lower())
-        return os.path.join(self.get_apps_dir(), folder_name)
+        path = self._paths["env_install"].get(env_name)
+        if path is None:
+            # 未知环境使用小写名称作为文件夹名
+            path = os.path.join(self._paths["apps"], env_name.lower())
+        return path
     
     def _save_config(self):
-        """保存配置到文件"""
+        """同步内存缓存并保存配置到文件"""
+        self._config_cache.update({
+            "manager_folder": self.get_manager_folder_name(),
+            "manager_folder_path": self.manager_folder_path,
+            "last_run_version": self.last_run_version
+        })
+        
         config_file = self.get_config_file()
         
         try:
-            data = {
-                "manager_folder": self.get_manager_folder_name(),
-                "manager_folder_path": self.manager_folder_path,
-                "last_run_version": self.last_run_version
-            }
+            # 将完整缓存写回文件
+            data = self._config_cache
             
             # 确保配置目录存在
             config_dir = os.path.dirname(config_file)
-            if not os.path.exists(config_dir):
-                os.makedirs(config_dir)
+            os.makedirs(config_dir, exist_ok=True)
             
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            atomic_write_json(config_file, data)
         except Exception as e:
             # 如果保存失败，尝试保存到程序目录（向后兼容）
             try:
@@ -876,7 +926,8 @@ class ConfigManager:
                     "manager_folder_path": self.manager_folder_path,
                     "last_run_version": self.last_run_version
                 }
-                with open(fallback_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=4, ensure_ascii=False)
+                Path(fallback_file).write_bytes(json_dumps(data))
+                # 程序目录下重新出现了config.json，下次迁移时需要再清理
+                ConfigManager._legacy_cwd_config_cleaned = False
             except Exception as e2:
                 pass
@@ -1,19 +1,27 @@
 from abc import ABC, abstractmethod
 import os
-import shutil
-import urllib.request
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import sys
 import zipfile
-import certifi
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 import stat
-import json
+from core.config import atomic_write_json, json_loads
+from core.http import SESSION, download_ranges, file_sha256, probe_download
 from core.logger import Logger
 from core.system_config import SystemConfig
 
 class EnvironmentManager(ABC):
+    # Remote version lists shared by all installer instances and persisted to
+    # config/version_cache.json as {class name: [fetched_at, versions]}
+    VERSION_CACHE_TTL = 3600
+    # Archives at least this large are fetched as parallel HTTP ranges when the
+    # server supports it; per-connection throughput on CDNs is often capped
+    PARALLEL_DOWNLOAD_MIN_SIZE = 8 << 20
+    DOWNLOAD_WORKERS = 6
+    _version_cache = None
+    _version_cache_lock = threading.Lock()
+
     def __init__(self):
         self.logger = Logger()
         self.sys_config = SystemConfig()
@@ -22,8 +30,38 @@ class EnvironmentManager(ABC):
         from core.config import ConfigManager
         config_manager = ConfigManager()
         self.download_dir = config_manager.get_downloads_dir()
-        if not os.path.exists(self.download_dir):
-            os.makedirs(self.download_dir)
+        os.makedirs(self.download_dir, exist_ok=True)
+        self._version_cache_file = os.path.join(config_manager.get_config_dir(), "version_cache.json")
+
+    def _load_version_cache(self):
+        """Read the shared version cache from disk once (caller holds the lock)"""
+        if EnvironmentManager._version_cache is None:
+            try:
+                with open(self._version_cache_file, 'rb') as f:
+                    cache = json_loads(f.read())
+                EnvironmentManager._version_cache = cache if isinstance(cache, dict) else {}
+            except Exception:
+                EnvironmentManager._version_cache = {}
+        return EnvironmentManager._version_cache
+
+    def get_cached_versions(self):
+        """Return the version data last stored by set_cached_versions if younger
+        than VERSION_CACHE_TTL, otherwise None"""
+        with EnvironmentManager._version_cache_lock:
+            entry = self._load_version_cache().get(type(self).__name__)
+        if entry and 0 <= time.time() - entry[0] < self.VERSION_CACHE_TTL:
+            return entry[1]
+        return None
+
+    def set_cached_versions(self, versions):
+        """Remember a successfully fetched remote version list (must be JSON serializable)"""
+        with EnvironmentManager._version_cache_lock:
+            cache = self._load_version_cache()
+            cache[type(self).__name__] = [time.time(), versions]
+            try:
+                atomic_write_json(self._version_cache_file, cache)
+            except Exception as e:
+                self.logger.warning(f"Failed to save version cache: {e}")
 
     def check_existing(self):
         """
@@ -48,8 +86,10 @@ class EnvironmentManager(ABC):
         """Return list of available versions"""
         pass
 
-    def download_file(self, url, filename, progress_callback=None, retries=5):
-        """Generic download with progress tracking and RESUMABLE retry logic"""
+    def download_file(self, url, filename, progress_callback=None, retries=5, sha256=None):
+        """Generic download with progress tracking and RESUMABLE retry logic.
+        If sha256 is given, cached and fresh downloads are verified against it
+        and a corrupt file is discarded and fetched again."""
         filepath = os.path.join(self.download_dir, filename)
         
         # If file exists and is complete? We don't know if it's complete without checking size.
@@ -62,27 +102,50 @@ class EnvironmentManager(ABC):
         # Since we don't have a checksum, we'll use the temp file approach or just append.
         # To keep it simple: we will try to download. If server says 206, we resume.
         
+        # A finished download is only ever created by renaming the .part file, so if it
+        # exists and matches the server's Content-Length we can skip the transfer.
+        head = None
+        if os.path.exists(filepath) and sha256:
+            # With a checksum the cached file can be verified without asking the server
+            if self._sha256_matches(filepath, sha256):
+                self.logger.info(f"Using verified cached download: {filepath}")
+                if progress_callback:
+                    progress_callback(100)
+                return filepath
+            self.logger.warning(f"Cached download failed checksum verification, downloading again: {filepath}")
+        elif os.path.exists(filepath):
+            try:
+                head = SESSION.head(url, timeout=(5, 10), allow_redirects=True)
+                expected = int(head.headers.get('content-length', 0))
+                if expected > 0 and os.path.getsize(filepath) == expected:
+                    self.logger.info(f"Using cached download: {filepath}")
+                    if progress_callback:
+                        progress_callback(100)
+                    return filepath
+            except Exception as e:
+                self.logger.warning(f"Could not verify cached file, downloading again: {e}")
+        
         self.logger.info(f"Downloading {url} to {filepath}")
         
-        session = requests.Session()
-        # Basic retry for connection setup
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-
         temp_filepath = filepath + ".part"
+        # Parallel ranges are written to a separate file: it is preallocated to the
+        # full size and has holes until every range lands, so it is never resumed from
+        ranges_filepath = filepath + ".ranges"
         
         # Check if we have a partial download
         resume_byte_pos = 0
         if os.path.exists(temp_filepath):
             resume_byte_pos = os.path.getsize(temp_filepath)
             self.logger.info(f"Found partial download, resuming from {resume_byte_pos} bytes...")
+        elif self._download_parallel(url, ranges_filepath, head, progress_callback):
+            if not sha256 or self._sha256_matches(ranges_filepath, sha256):
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                os.rename(ranges_filepath, filepath)
+                self.logger.info("Download complete.")
+                return filepath
+            self.logger.warning("Downloaded file failed checksum verification, downloading again.")
+            os.remove(ranges_filepath)
 
         last_error = None
         
@@ -93,7 +156,14 @@ class EnvironmentManager(ABC):
                     headers["Range"] = f"bytes={resume_byte_pos}-"
                 
                 # Timeout: (connect, read)
-                with session.get(url, stream=True, verify=True, headers=headers, timeout=(10, 30)) as response:
+                with SESSION.get(url, stream=True, verify=True, headers=headers, timeout=(10, 30)) as response:
+                    if response.status_code == 416 and resume_byte_pos > 0:
+                        # The partial file is not shorter than the resource (e.g. the
+                        # download finished but was never renamed); start over
+                        self.logger.warning("Server rejected the resume offset (416), restarting download.")
+                        os.remove(temp_filepath)
+                        resume_byte_pos = 0
+                        continue
                     response.raise_for_status()
                     
                     mode = 'ab' if resume_byte_pos > 0 else 'wb'
@@ -116,23 +186,32 @@ class EnvironmentManager(ABC):
                     else:
                         total_size = 0 # Unknown
 
-                    block_size = 8192
+                    # 1 MiB blocks keep the Python-level loop short on large archives
+                    block_size = 1 << 20
                     downloaded = resume_byte_pos
+                    # Notify every 1% or 512 KiB, whichever is larger
+                    notify_every = max(total_size // 100, 512 * 1024)
+                    next_notify = downloaded + notify_every
                     
                     with open(temp_filepath, mode) as f:
+                        # iter_content never yields empty chunks for streamed bodies
                         for chunk in response.iter_content(chunk_size=block_size):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                if progress_callback and total_size > 0:
-                                    percent = int(downloaded * 100 / total_size)
-                                    progress_callback(min(percent, 100))
+                            f.write(chunk)
+                            downloaded += len(chunk)
+                            if progress_callback and total_size > 0 and downloaded >= next_notify:
+                                progress_callback(min(int(downloaded * 100 / total_size), 100))
+                                next_notify = downloaded + notify_every
                 
                 # If we got here without exception, download is likely complete or stream finished naturally.
                 # Verify size if possible
                 if total_size > 0 and downloaded < total_size:
                     raise Exception(f"Incomplete download: {downloaded}/{total_size}")
                 
+                if sha256 and not self._sha256_matches(temp_filepath, sha256):
+                    # Never resume from corrupt data; the next attempt starts over
+                    os.remove(temp_filepath)
+                    raise Exception("Checksum mismatch, discarded download")
+                
                 # Success! Rename temp file to actual file
                 if os.path.exists(filepath):
                     os.remove(filepath)
@@ -150,27 +229,103 @@ class EnvironmentManager(ABC):
                 time.sleep(2) # Wait before retry
                 
                 # Update resume position for next attempt
-                if os.path.exists(temp_filepath):
-                    resume_byte_pos = os.path.getsize(temp_filepath)
+                resume_byte_pos = os.path.getsize(temp_filepath) if os.path.exists(temp_filepath) else 0
         
         # If we exhausted retries
         self.logger.error(f"Download failed after {retries} attempts.")
         raise last_error
 
+    def _sha256_matches(self, path, expected):
+        """Compare the file's SHA-256 with the expected hex digest"""
+        return file_sha256(path) == expected.strip().lower()
+
+    def _download_parallel(self, url, temp_filepath, head=None, progress_callback=None):
+        """
+        Fetch url into temp_filepath as DOWNLOAD_WORKERS concurrent Range requests.
+        Returns False (leaving no partial file) if the server does not support
+        ranges, the file is small, or any range fails, so the caller can fall
+        back to the resumable single-stream download.
+        """
+        if os.path.exists(temp_filepath):
+            # Left behind by an interrupted run; its holes make it useless
+            os.remove(temp_filepath)
+        try:
+            total_size, accept_ranges, final_url = probe_download(url, head)
+        except Exception as e:
+            self.logger.warning(f"Could not probe for parallel download: {e}")
+            return False
+        if not accept_ranges or total_size < self.PARALLEL_DOWNLOAD_MIN_SIZE:
+            return False
+
+        self.logger.info(f"Downloading {url} ({total_size} bytes) in parallel ranges...")
+        try:
+            # Range requests go straight to the redirect target (e.g. Adoptium -> GitHub CDN)
+            download_ranges(final_url, temp_filepath, total_size, progress_callback, workers=self.DOWNLOAD_WORKERS)
+        except Exception as e:
+            self.logger.warning(f"Parallel download failed, falling back to single stream: {e}")
+            try:
+                os.remove(temp_filepath)
+            except OSError:
+                pass
+            return False
+        return True
+
     def extract_zip(self, zip_path, extract_to, progress_callback=None):
-        """Generic zip extraction"""
+        """Generic zip extraction.
+
+        Entries are inflated by a small thread pool (zlib releases the GIL).
+        ZipFile is not safe for concurrent reads, so each worker thread opens
+        its own handle on the archive. The directory tree is created up front
+        so workers never race on a shared parent directory.
+        """
         self.logger.info(f"Extracting {zip_path} to {extract_to}")
         try:
-            if not os.path.exists(extract_to):
-                os.makedirs(extract_to)
+            os.makedirs(extract_to, exist_ok=True)
             
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                total_files = len(zip_ref.infolist())
-                for i, file in enumerate(zip_ref.infolist()):
-                    zip_ref.extract(file, extract_to)
-                    if progress_callback:
-                        percent = int((i + 1) * 100 / total_files)
-                        progress_callback(percent)
+                members = zip_ref.infolist()
+            total_files = len(members)
+            
+            dirs = set()
+            for member in members:
+                # Same path sanitising as ZipFile.extract
+                name = os.path.splitdrive(member.filename.replace('\\', '/'))[1]
+                parts = [p for p in name.split('/') if p not in ('', '.', '..')]
+                if not member.is_dir():
+                    parts = parts[:-1]
+                if parts:
+                    dirs.add(os.path.join(extract_to, *parts))
+            for d in dirs:
+                os.makedirs(d, exist_ok=True)
+            
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+            
+            def _extract(member):
+                zip_ref = getattr(local, "zip_ref", None)
+                if zip_ref is None:
+                    zip_ref = zipfile.ZipFile(zip_path, 'r')
+                    local.zip_ref = zip_ref
+                    with handles_lock:
+                        handles.append(zip_ref)
+                zip_ref.extract(member, extract_to)
+            
+            workers = min(8, os.cpu_count() or 1)
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_extract, member) for member in members]
+                    last_percent = -1
+                    for i, future in enumerate(as_completed(futures)):
+                        future.result()
+                        if progress_callback:
+                            percent = int((i + 1) * 100 / total_files)
+                            if percent != last_percent:
+                                last_percent = percent
+                                progress_callback(percent)
+            finally:
+                for zip_ref in handles:
+                    zip_ref.close()
                         
             self.logger.info("Extraction complete.")
             # Return the actual directory name if it extracts into a subdirectory
@@ -181,6 +336,31 @@ class EnvironmentManager(ABC):
             self.logger.error(f"Extraction failed: {str(e)}")
             raise e
 
+    def find_home_dir(self, root_dir, markers, max_depth=2):
+        """
+        Return the shallowest directory at most max_depth levels below root_dir
+        that contains one of the marker files (paths relative to that directory,
+        e.g. bin/java.exe), or None.
+        Only directory entries are listed, so large install trees are never walked.
+        """
+        level = [root_dir]
+        for depth in range(max_depth + 1):
+            for candidate in level:
+                for marker in markers:
+                    if os.path.isfile(os.path.join(candidate, marker)):
+                        return candidate
+            if depth == max_depth:
+                break
+            next_level = []
+            for candidate in level:
+                try:
+                    with os.scandir(candidate) as it:
+                        next_level.extend(entry.path for entry in it if entry.is_dir())
+                except OSError:
+                    pass
+            level = next_level
+        return None
+
     @abstractmethod
     def install(self, version, install_dir, progress_callback=None):
         """Main installation logic"""
@@ -188,7 +368,7 @@ class EnvironmentManager(ABC):
 
     def _on_rm_error(self, func, path, exc_info):
         """
-        Error handler for shutil.rmtree.
+        Error handler for _rmtree.
         If the error is due to an access error (read only file)
         it attempts to add write permission and then retries.
         If the error is because the file is not found, it ignores it.
@@ -204,6 +384,48 @@ class EnvironmentManager(ABC):
         
         self.logger.error(f"Failed to remove {path}: {exc_info[1]}")
 
+    def _is_link(self, entry):
+        """True for symlinks and Windows junctions, which must be unlinked, not descended into"""
+        if entry.is_symlink():
+            return True
+        attributes = getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0)
+        return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+    def _rmtree(self, path):
+        """
+        Delete a directory tree bottom-up in a single os.scandir pass.
+        scandir entries carry their file type, so nothing is stat'ed twice, and
+        read-only entries are only chmod'ed (via _on_rm_error) when a delete is refused.
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            self._on_rm_error(os.scandir, path, sys.exc_info())
+            return
+        
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False) and not self._is_link(entry)
+            except OSError:
+                is_dir = False
+            if is_dir:
+                self._rmtree(entry.path)
+                continue
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                self._on_rm_error(os.unlink, entry.path, sys.exc_info())
+        
+        try:
+            os.rmdir(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            self._on_rm_error(os.rmdir, path, sys.exc_info())
+
     def remove_directory(self, path):
         """Safely remove a directory"""
         if not os.path.exists(path):
@@ -212,16 +434,59 @@ class EnvironmentManager(ABC):
         
         try:
             self.logger.info(f"Removing directory: {path}")
-            # Basic safety check
-            if len(os.path.abspath(path)) < 5: # e.g. C:\ or D:\
+            # Basic safety check; callers pass absolute install paths, so
+            # abspath (and its getcwd call) is only needed for relative ones
+            full_path = path if os.path.isabs(path) else os.path.abspath(path)
+            if len(full_path) < 5: # e.g. C:\ or D:\
                  raise Exception(f"Path too short/unsafe, refusing to delete: {path}")
                  
-            shutil.rmtree(path, onerror=self._on_rm_error)
+            self._rmtree(path)
             self.logger.info("Directory removed.")
         except Exception as e:
              self.logger.error(f"Failed to remove directory: {e}")
              raise e
 
+    def normalize_path(self, path):
+        """Canonical form for comparing Windows paths (separators, .., and case)"""
+        return os.path.normcase(os.path.normpath(path))
+
+    def _dir_is_empty(self, path):
+        """Check emptiness by reading at most one entry instead of listing the directory"""
+        with os.scandir(path) as it:
+            return next(it, None) is None
+
+    def remove_empty_parents(self, home_dir, install_path):
+        """
+        After home_dir was removed, delete the directories it leaves empty up to
+        install_path, and install_path itself if nothing else is in it.
+        """
+        try:
+            install_path_normalized = self.normalize_path(install_path)
+            current_dir = os.path.dirname(home_dir)
+            
+            while current_dir and self.normalize_path(current_dir) != install_path_normalized:
+                if not os.path.exists(current_dir):
+                    break
+                try:
+                    if not self._dir_is_empty(current_dir):
+                        break  # Directory not empty, stop
+                    os.rmdir(current_dir)
+                    self.logger.info(f"Removed empty directory: {current_dir}")
+                    current_dir = os.path.dirname(current_dir)
+                except Exception as e:
+                    self.logger.warning(f"Could not remove directory {current_dir}: {e}")
+                    break
+            
+            # Also check if install_path itself is now empty
+            if os.path.exists(install_path) and self._dir_is_empty(install_path):
+                try:
+                    os.rmdir(install_path)
+                    self.logger.info(f"Removed empty install directory: {install_path}")
+                except Exception as e:
+                    self.logger.warning(f"Could not remove install directory: {e}")
+        except Exception as e:
+            self.logger.warning(f"Error cleaning up parent directories: {e}")
+
     @abstractmethod
     def uninstall(self, install_dir, progress_callback=None):
         """Uninstall logic"""
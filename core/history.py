@@ -1,6 +1,6 @@
-import json
 import os
 from datetime import datetime
+from core.config import atomic_write_json, json_loads
 from core.logger import Logger
 
 class HistoryManager:
@@ -11,6 +11,12 @@ class HistoryManager:
         config_manager = ConfigManager()
         self.history_file = config_manager.get_history_file()
         self._ensure_file()
+        # Records are kept in memory, keyed by normalized path, for reads;
+        # every change is written back to disk right away by _save_records().
+        # Incremented on every change to the records, so views can skip
+        # rebuilding when nothing changed
+        self.revision = 0
+        self._load_records()
 
     def _ensure_file(self):
         if not os.path.exists(self.history_file):
@@ -18,30 +24,53 @@ class HistoryManager:
 
     def _load_data(self):
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(self.history_file, 'rb') as f:
+                return json_loads(f.read())
         except Exception as e:
             self.logger.error(f"Failed to load history: {e}")
             return {"installed": []}
 
     def _save_data(self, data):
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
+            atomic_write_json(self.history_file, data)
         except Exception as e:
             self.logger.error(f"Failed to save history: {e}")
 
+    def _path_key(self, path):
+        """Normalized, case-insensitive (on Windows) index key for a record path"""
+        return os.path.normcase(os.path.normpath(path))
+
+    def _load_records(self):
+        """Read the history file once into the in-memory index"""
+        self._data = self._load_data()
+        self._records = {}
+        for r in self._data.get("installed", []):
+            self._records[self._path_key(r['path'])] = r
+
+    def _save_records(self):
+        """Write the in-memory records to the history file"""
+        self._data["installed"] = list(self._records.values())
+        self._save_data(self._data)
+
+    def reload(self, history_file=None):
+        """Discard the in-memory records and re-read from disk.
+
+        Pass history_file when the manager folder has moved.
+        """
+        if history_file:
+            self.history_file = history_file
+        self._load_records()
+        self.revision += 1
+
     def add_record(self, env, version, path):
         """Add or update an installation record"""
-        data = self._load_data()
-        records = data.get("installed", [])
-        
         # Check if path already exists, update it if so
         # Or check if env+version exists? A user might reinstall to a new path.
         # Let's key primarily by Path, as that's unique for an installation on disk.
+        key = self._path_key(path)
         
-        # Remove existing record with same path to avoid duplicates
-        records = [r for r in records if os.path.normpath(r['path']) != os.path.normpath(path)]
+        # Remove existing record with same path to avoid duplicates (re-added at the end)
+        self._records.pop(key, None)
         
         new_record = {
             "env": env,
@@ -49,26 +78,18 @@ class HistoryManager:
             "path": path,
             "install_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-        records.append(new_record)
-        
-        data["installed"] = records
-        self._save_data(data)
+        self._records[key] = new_record
+        self.revision += 1
+        self._save_records()
         self.logger.info(f"History updated: Added {env} at {path}")
 
     def remove_record(self, path):
         """Remove a record by path"""
-        data = self._load_data()
-        records = data.get("installed", [])
-        
-        initial_len = len(records)
-        records = [r for r in records if os.path.normpath(r['path']) != os.path.normpath(path)]
-        
-        if len(records) < initial_len:
-            data["installed"] = records
-            self._save_data(data)
+        if self._records.pop(self._path_key(path), None) is not None:
+            self.revision += 1
+            self._save_records()
             self.logger.info(f"History updated: Removed record for {path}")
 
     def get_records(self):
         """Get all installation records"""
-        return self._load_data().get("installed", [])
-
+        return list(self._records.values())
@@ -0,0 +1,97 @@
+import atexit
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from core.version import APP_VERSION
+
+# Shared HTTP session for all downloads and API calls.
+# Reusing it keeps TCP/TLS connections alive between requests to the same host.
+SESSION = requests.Session()
+
+# Basic retry for connection setup
+_retry_strategy = Retry(
+    total=3,
+    backoff_factor=1,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["HEAD", "GET", "OPTIONS"]
+)
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=_retry_strategy)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+SESSION.headers.update({"User-Agent": f"DevEnv-OneClick-Installer/{APP_VERSION}"})
+
+# Close pooled connections on interpreter exit
+atexit.register(SESSION.close)
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in 1 MiB blocks"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def probe_download(url, head=None):
+    """Return (size, accepts byte ranges, final URL after redirects) of a download.
+
+    Pass an existing HEAD response to avoid a second request. Raises on HTTP errors.
+    """
+    if head is None:
+        head = SESSION.head(url, timeout=(5, 10), allow_redirects=True)
+    head.raise_for_status()
+    total_size = int(head.headers.get('content-length', 0))
+    accept_ranges = head.headers.get('accept-ranges', '').lower() == 'bytes'
+    return total_size, accept_ranges, head.url or url
+
+
+def download_ranges(url, save_path, total_size, progress_callback=None, workers=4, parts=None):
+    """Download url into save_path as concurrent HTTP Range requests.
+
+    The file is preallocated and every range is written at its own offset through
+    a per-thread handle. Raises if the server ignores a range or a range comes
+    back short; the file then has holes and must not be resumed from.
+    """
+    parts = parts or workers
+    chunk_size = max(1 << 20, -(-total_size // parts))
+    ranges = [(start, min(start + chunk_size, total_size) - 1)
+              for start in range(0, total_size, chunk_size)]
+
+    with open(save_path, 'wb') as f:
+        f.truncate(total_size)
+
+    lock = threading.Lock()
+    notify_every = max(total_size // 100, 512 * 1024)
+    state = {"downloaded": 0, "next_notify": notify_every}
+
+    def _fetch(byte_range):
+        start, end = byte_range
+        headers = {"Range": f"bytes={start}-{end}"}
+        with SESSION.get(url, stream=True, headers=headers, timeout=(10, 30)) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise IOError(f"Server ignored range request (HTTP {response.status_code})")
+            written = 0
+            with open(save_path, 'r+b') as f:
+                f.seek(start)
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+                    written += len(chunk)
+                    with lock:
+                        state["downloaded"] += len(chunk)
+                        if progress_callback and state["downloaded"] >= state["next_notify"]:
+                            progress_callback(min(state["downloaded"] * 100 // total_size, 100))
+                            state["next_notify"] = state["downloaded"] + notify_every
+        if written != end - start + 1:
+            raise IOError(f"Incomplete range {start}-{end}: got {written} bytes")
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Consuming the results re-raises the first failed range
+        list(pool.map(_fetch, ranges))
+
+    if progress_callback:
+        progress_callback(100)
@@ -1,33 +1,48 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 
 class Logger:
     _instance = None
+    # 已解析的日志目录，避免每次初始化都构造ConfigManager
+    _logs_dir = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Logger, cls).__new__(cls)
+            cls._instance.gui_callback = None
+            cls._instance._listener = None
+            atexit.register(cls._instance.close_handlers)
             cls._instance._initialize_logger()
         return cls._instance
 
-    def _initialize_logger(self):
+    def _initialize_logger(self, logs_dir=None):
+        """初始化日志处理器（异步写入），已初始化则跳过；logs_dir用于迁移后切换日志目录"""
         self.logger = logging.getLogger("DevEnvInstaller")
+        if self.logger.handlers:
+            return
         self.logger.setLevel(logging.INFO)
         
+        if logs_dir is not None:
+            Logger._logs_dir = logs_dir
+        
         # 使用统一管理文件夹下的logs目录
-        try:
-            from core.config import ConfigManager
-            config_manager = ConfigManager()
-            logs_dir = config_manager.get_logs_dir()
-        except Exception:
-            # 如果ConfigManager初始化失败，使用程序目录下的logs（向后兼容）
-            logs_dir = os.path.join(os.getcwd(), "logs")
+        if Logger._logs_dir is None:
+            try:
+                from core.config import ConfigManager
+                config_manager = ConfigManager()
+                Logger._logs_dir = config_manager.get_logs_dir()
+            except Exception:
+                # 如果ConfigManager初始化失败，使用程序目录下的logs（向后兼容）
+                Logger._logs_dir = os.path.join(os.getcwd(), "logs")
+        logs_dir = Logger._logs_dir
         
         # Create logs directory if it doesn't exist
-        if not os.path.exists(logs_dir):
-            os.makedirs(logs_dir)
+        os.makedirs(logs_dir, exist_ok=True)
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_file = os.path.join(logs_dir, f"install_{timestamp}.log")
@@ -44,10 +59,23 @@ class Logger:
         console_formatter = logging.Formatter('%(levelname)s: %(message)s')
         console_handler.setFormatter(console_formatter)
         
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-        
-        self.gui_callback = None
+        # Only the queue handler lives on the logger; the listener thread owns
+        # the file and console handlers
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+        self._listener.start()
+
+    def close_handlers(self):
+        """Drain pending records, stop the listener and release the log file"""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+        for handler in self.logger.handlers[:]:
+            handler.close()
+            self.logger.removeHandler(handler)
 
     def set_gui_callback(self, callback):
         """Set a callback function to update GUI logs"""
@@ -1,6 +1,7 @@
 import winreg
 import ctypes
 import os
+from contextlib import contextmanager
 from core.logger import Logger
 
 class SystemConfig:
@@ -8,9 +9,86 @@ class SystemConfig:
         self.logger = Logger()
         # Using HKCU (HKEY_CURRENT_USER) to avoid admin requirement
         self.key_path = r"Environment"
+        # Pending writes while inside batch(): NAME -> (name, value, type); value None means delete
+        self._batching = False
+        self._pending = {}
+        # Registry value type of PATH, read once
+        self._path_type = None
+
+    @contextmanager
+    def batch(self):
+        """Buffer env var / PATH writes and apply them on exit with a single
+        registry open and a single WM_SETTINGCHANGE broadcast.
+        A failed write raises on exit, since the buffered calls already returned True."""
+        if self._batching:
+            # Nested batch: the outermost one flushes
+            yield self
+            return
+        self._batching = True
+        try:
+            yield self
+        except BaseException:
+            # Still apply what was buffered (as unbatched writes would have),
+            # but let the original error propagate
+            self._batching = False
+            try:
+                self._flush_pending()
+            except Exception:
+                pass
+            raise
+        self._batching = False
+        self._flush_pending()
+
+    def _flush_pending(self):
+        """Write all buffered changes to HKCU\\Environment, raising on failure"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0,
+                                winreg.KEY_READ | winreg.KEY_SET_VALUE) as key:
+                for name, value, type_ in pending.values():
+                    if value is None:
+                        try:
+                            winreg.DeleteValue(key, name)
+                        except FileNotFoundError:
+                            pass
+                    else:
+                        if type_ is None:
+                            type_ = self._get_path_type(key)
+                        winreg.SetValueEx(key, name, 0, type_, value)
+            self.logger.info(f"Applied {len(pending)} environment change(s).")
+            self._notify_system_change()
+        except Exception as e:
+            self.logger.error(f"Failed to apply environment changes: {str(e)}")
+            raise
+
+    def _get_path_type(self, key):
+        """Registry value type of PATH, queried on the already open key once and cached"""
+        if self._path_type is None:
+            try:
+                _, self._path_type = winreg.QueryValueEx(key, "PATH")
+            except FileNotFoundError:
+                self._path_type = winreg.REG_EXPAND_SZ # Default for PATH
+        return self._path_type
+
+    def _write_path(self, new_path_val):
+        """Write PATH, or buffer it when batching"""
+        if self._batching:
+            # Type is resolved when the batch is flushed
+            self._pending["PATH"] = ("PATH", new_path_val, None)
+            return
+        # Single open for both reading the value type and writing
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0,
+                            winreg.KEY_READ | winreg.KEY_SET_VALUE) as key:
+            winreg.SetValueEx(key, "PATH", 0, self._get_path_type(key), new_path_val)
+        self._notify_system_change()
 
     def get_env_variable(self, name):
         """Get user environment variable value"""
+        pending = self._pending.get(name.upper())
+        if pending is not None:
+            return pending[1]
         try:
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_READ) as key:
                 value, _ = winreg.QueryValueEx(key, name)
@@ -24,6 +102,10 @@ class SystemConfig:
     def set_env_variable(self, name, value):
         """Set user environment variable"""
         try:
+            if self._batching:
+                self._pending[name.upper()] = (name, value, winreg.REG_SZ)
+                self.logger.info(f"Set environment variable: {name}={value}")
+                return True
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_SET_VALUE) as key:
                 winreg.SetValueEx(key, name, 0, winreg.REG_SZ, value)
             self.logger.info(f"Set environment variable: {name}={value}")
@@ -43,30 +125,28 @@ class SystemConfig:
             if not current_path:
                 current_path = ""
 
-            paths = [p.strip() for p in current_path.split(";") if p.strip()]
+            # One pass: case-insensitive de-dup keeping the first occurrence's casing and order
+            seen = {}
+            for p in current_path.split(";"):
+                p = p.strip()
+                if p:
+                    seen.setdefault(p.lower(), p)
             
             # Remove existing if any (to re-position it)
-            paths = [p for p in paths if p.lower() != new_path.lower()]
+            seen.pop(new_path.lower(), None)
 
             # Insert
             if prepend:
-                paths.insert(0, new_path)
+                paths = [new_path]
+                paths.extend(seen.values())
             else:
+                paths = list(seen.values())
                 paths.append(new_path)
             
             new_path_val = ";".join(paths)
-            
-            try:
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_READ) as key:
-                    _, type_ = winreg.QueryValueEx(key, "PATH")
-            except:
-                type_ = winreg.REG_EXPAND_SZ # Default for PATH
-            
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_SET_VALUE) as key:
-                winreg.SetValueEx(key, "PATH", 0, type_, new_path_val)
+            self._write_path(new_path_val)
             
             self.logger.info(f"Updated PATH (prepend={prepend}): {new_path}")
-            self._notify_system_change()
             return True
         except Exception as e:
             self.logger.error(f"Failed to modify PATH: {str(e)}")
@@ -97,6 +177,10 @@ class SystemConfig:
     def remove_env_variable(self, name):
         """Remove user environment variable"""
         try:
+            if self._batching:
+                self._pending[name.upper()] = (name, None, None)
+                self.logger.info(f"Removed environment variable: {name}")
+                return True
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_SET_VALUE) as key:
                 winreg.DeleteValue(key, name)
             self.logger.info(f"Removed environment variable: {name}")
@@ -129,18 +213,9 @@ class SystemConfig:
                 return True
 
             new_path_val = ";".join(new_paths)
-            
-            try:
-                with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_READ) as key:
-                    _, type_ = winreg.QueryValueEx(key, "PATH")
-            except:
-                type_ = winreg.REG_EXPAND_SZ
-
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.key_path, 0, winreg.KEY_SET_VALUE) as key:
-                winreg.SetValueEx(key, "PATH", 0, type_, new_path_val)
+            self._write_path(new_path_val)
             
             self.logger.info(f"Removed from PATH: {path_to_remove}")
-            self._notify_system_change()
             return True
         except Exception as e:
             self.logger.error(f"Failed to remove from PATH: {str(e)}")
@@ -0,0 +1,99 @@
+import ctypes
+import os
+import subprocess
+import sys
+import time
+
+# Windows API 常量
+SYNCHRONIZE = 0x00100000
+PROCESS_TERMINATE = 0x0001
+WAIT_TIMEOUT = 0x00000102
+MB_ICONERROR = 0x10
+
+
+def _wait_for_process_exit(pid, timeout_ms=30000):
+    """等待进程退出（WaitForSingleObject），超时后强制结束；进程已不存在时立即返回True"""
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(SYNCHRONIZE | PROCESS_TERMINATE, False, pid)
+    if not handle:
+        return True
+    try:
+        if kernel32.WaitForSingleObject(handle, timeout_ms) != WAIT_TIMEOUT:
+            return True
+        # 旧进程未按时退出（如界面卡住），与原更新脚本一样强制结束
+        kernel32.TerminateProcess(handle, 1)
+        return kernel32.WaitForSingleObject(handle, 5000) != WAIT_TIMEOUT
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _retry(func, *args):
+    """文件句柄尚未释放时按100/200/400/800毫秒退避重试
+
+    只重试共享冲突（Windows上为PermissionError），其它错误（如文件不存在）立即抛出。
+    """
+    delay = 0.1
+    for attempt in range(5):
+        try:
+            return func(*args)
+        except PermissionError:
+            if attempt == 4:
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+
+def _copy_file(source, target):
+    """用 CopyFileW 复制（系统原生复制，跨卷时也不经过Python读写循环），保留时间戳和属性"""
+    if not ctypes.windll.kernel32.CopyFileW(source, target, False):
+        # WinError 会按错误码映射为 PermissionError 等子类，便于 _retry 判断
+        raise ctypes.WinError()
+
+
+def _show_error(message):
+    ctypes.windll.user32.MessageBoxW(None, message, "更新错误", MB_ICONERROR)
+
+
+def apply_update(pid, target, backup):
+    """等待旧进程退出，用当前exe（新版本）替换 target 并启动
+
+    由 Updater.perform_update 以 "--apply-update <pid> <target> <backup>" 启动。
+    """
+    source = os.path.abspath(sys.executable)
+    if not _wait_for_process_exit(pid):
+        _show_error("更新失败: 旧版本程序未退出")
+        return 1
+    
+    try:
+        # 同一卷内 os.replace 为原子重命名
+        if os.path.exists(target):
+            _retry(os.replace, target, backup)
+        try:
+            _retry(_copy_file, source, target)
+        except OSError:
+            # 复制失败时还原旧版本
+            if os.path.exists(backup):
+                os.replace(backup, target)
+            raise
+    except OSError as e:
+        _show_error(f"更新失败: {e}")
+        return 1
+    
+    try:
+        os.remove(backup)
+    except OSError:
+        pass
+    
+    try:
+        subprocess.Popen([target], cwd=os.path.dirname(target), close_fds=True,
+                         creationflags=subprocess.DETACHED_PROCESS)
+    except OSError as e:
+        _show_error(f"无法启动新版本: {e}")
+        return 1
+    return 0
+
+
+def main(args):
+    """命令行入口，args 为 [pid, target, backup]"""
+    pid, target, backup = args
+    return apply_update(int(pid), target, backup)
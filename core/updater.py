@@ -1,110 +1,481 @@
+import hashlib
 import os
+import re
+import string
 import sys
-import requests
 import subprocess
+import threading
 import time
+from concurrent.futures import Future
+from functools import lru_cache
+from core.config import atomic_write_json, json_loads
+from core.http import SESSION, download_ranges, file_sha256, probe_download
 from core.logger import Logger
 from core.version import APP_VERSION, GITHUB_REPO
 
+# packaging 为可选依赖，可正确比较预发布版本（如 1.2.0rc1）
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:
+    Version = None
+
+
+@lru_cache(maxsize=128)
+def _version_tuple(v):
+    """取版本号开头的数字部分，去掉末尾的0（1.2 与 1.2.0 相等）"""
+    parts = []
+    for x in re.split(r"[.\-+]", v.strip()):
+        if not x.isdigit():
+            break
+        parts.append(int(x))
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+@lru_cache(maxsize=128)
+def _parse_version(v):
+    """解析版本号，packaging 不可用或无法解析时返回 None"""
+    if Version is None:
+        return None
+    try:
+        return Version(v)
+    except InvalidVersion:
+        return None
+
+
+# 当前版本只解析一次
+_APP_VERSION = _parse_version(APP_VERSION)
+_APP_VERSION_TUPLE = _version_tuple(APP_VERSION)
+
+
+def _run_in_background(func, *args):
+    """在守护线程中执行 func，返回其 Future
+
+    不使用线程池：线程池的工作线程在解释器退出时会被等待，
+    关闭窗口后进行中的网络请求会让进程继续存活到超时。
+    """
+    future = Future()
+
+    def _run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=_run, daemon=True).start()
+    return future
+
+
+def _throttle_progress(callback, min_interval=0.1):
+    """限制进度回调频率：两次回调至少间隔 min_interval 秒（100% 总是回调），可被多线程调用"""
+    lock = threading.Lock()
+    state = {"last": 0.0}
+
+    def _report(progress):
+        now = time.monotonic()
+        with lock:
+            if progress < 100 and now - state["last"] < min_interval:
+                return
+            state["last"] = now
+        callback(progress)
+    return _report
+
+
+def _is_newer_version(latest):
+    """latest 是否比当前程序版本新"""
+    parsed = _parse_version(latest)
+    if parsed is not None and _APP_VERSION is not None:
+        return parsed > _APP_VERSION
+    return _version_tuple(latest) > _APP_VERSION_TUPLE
+
+
+# 最后一个不含 core.update_runner（--apply-update 模式）的版本
+_LAST_VERSION_WITHOUT_RUNNER = "1.0.0"
+
+
+def _supports_update_runner(version):
+    """version 对应的exe是否支持 --apply-update；版本未知时按不支持处理"""
+    if not version:
+        return False
+    version = version.lstrip("v")
+    parsed = _parse_version(version)
+    baseline = _parse_version(_LAST_VERSION_WITHOUT_RUNNER)
+    if parsed is not None and baseline is not None:
+        return parsed > baseline
+    return _version_tuple(version) > _version_tuple(_LAST_VERSION_WITHOUT_RUNNER)
+
+
+class _UpdateScriptTemplate(string.Template):
+    """以 %% 作为占位符前缀，批处理/PowerShell 中的 $ 与 {} 原样保留"""
+    delimiter = "%%"
+
+
+# 回退更新脚本（update_installer.bat）：批处理内联 PowerShell，占位符为转义后的路径与进程ID
+_UPDATE_SCRIPT = _UpdateScriptTemplate(
+    '@echo off\n'
+    'chcp 65001 > NUL 2>&1\n'  # 设置 UTF-8 编码，静默
+    # 使用 -WindowStyle Hidden 隐藏 PowerShell 窗口
+    'powershell.exe -ExecutionPolicy Bypass -WindowStyle Hidden -Command "'
+    '$ErrorActionPreference = \\"Stop\\"; '
+    # 使用单引号包裹路径，避免转义问题
+    "$currentExe = '%%current_exe'; "
+    "$newExe = '%%new_exe'; "
+    "$oldBackup = '%%old_backup'; "
+    '$currentPid = %%current_pid; '
+    # File.Move 不经过 cmdlet 管道；只在共享冲突（IOException）时按100/200/400毫秒退避重试
+    'function Move-File($src, $dst) { $delays = 100, 200, 400; $i = 0; '
+    'while ($true) { try { [System.IO.File]::Move($src, $dst); return } '
+    'catch [System.IO.IOException] { if ($i -ge $delays.Count) { throw }; Start-Sleep -Milliseconds $delays[$i]; $i++ } } }; '
+    # 移除所有 Write-Host，静默执行
+    # 等待进程句柄而不是固定休眠：进程一退出立即继续
+    'try { $process = Get-Process -Id $currentPid -ErrorAction SilentlyContinue; '
+    'if ($process) { $process.CloseMainWindow() | Out-Null; '
+    'if (-not $process.WaitForExit(5000)) { Stop-Process -Id $currentPid -Force -ErrorAction SilentlyContinue; '
+    '$process.WaitForExit(25000) | Out-Null } } } '
+    'catch { }; '  # 静默处理错误
+    # 探测exe是否已可独占打开（文件句柄已释放），最多约5秒
+    '$tries = 0; while ((Test-Path $currentExe) -and ($tries -lt 50)) { '
+    "try { [System.IO.File]::Open($currentExe, 'Open', 'ReadWrite', 'None').Close(); break } "
+    'catch { Start-Sleep -Milliseconds 100; $tries++ } }; '
+    '$currentDir = Split-Path -Parent $currentExe; '
+    'if (-not (Test-Path $currentDir)) { New-Item -ItemType Directory -Path $currentDir -Force | Out-Null }; '
+    'if (-not (Test-Path $newExe)) { throw \\"新版本文件不存在\\" }; '
+    'try { if (Test-Path $currentExe) { '
+    # File.Move 不覆盖目标，先删除上次更新残留的备份
+    'if (Test-Path $oldBackup) { Remove-Item -Path $oldBackup -Force }; '
+    'Move-File $currentExe $oldBackup }; '
+    'Move-File $newExe $currentExe; '
+    'if (Test-Path $oldBackup) { Remove-Item -Path $oldBackup -Force -ErrorAction SilentlyContinue }; '
+    'if (-not (Test-Path $currentExe)) { throw \\"更新后的文件不存在\\" }; '
+    '$exeDir = Split-Path -Parent $currentExe; '
+    'try { Start-Process -FilePath $currentExe -WorkingDirectory $exeDir -WindowStyle Hidden -ErrorAction Stop | Out-Null } '
+    'catch { try { Push-Location $exeDir; cmd /c start \\"\\" \\"$currentExe\\"; Pop-Location } catch { throw \\"无法启动新版本\\" } } } '
+    'catch { if (Test-Path $oldBackup) { Move-Item -Path $oldBackup -Destination $currentExe -Force -ErrorAction SilentlyContinue }; '
+    # 只有出错时才显示错误窗口
+    '$wshell = New-Object -ComObject WScript.Shell; '
+    '$wshell.Popup(\\"更新失败: $_\\", 0, \\"更新错误\\", 0x10); exit 1 }"\n'
+    'if %errorlevel% equ 0 (\n'
+    '    timeout /t 1 /nobreak > NUL 2>&1\n'
+    '    del /F /Q "%~f0" > NUL 2>&1\n'
+    ')\n'
+)
+
+
 class Updater:
     def __init__(self, config_manager):
         self.logger = Logger()
         self.config_manager = config_manager
         self.github_api_url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+        # 距上次检查不足该时长时直接使用缓存结果，不发起网络请求
+        self.check_ttl_seconds = 6 * 3600
+        # 手动检查（force=True）时使用的较短缓存时间，避免连续点击重复请求
+        self.force_check_ttl_seconds = 600
+        # GitHub API 频率限制状态（来自 X-RateLimit-* 响应头），额度用尽时在重置前不再请求
+        self._rl_remaining = None
+        self._rl_reset = 0
+        # 并行分块下载：线程数，以及启用并行下载的最小文件大小
+        self.download_workers = 4
+        self.parallel_min_size = 4 << 20
+        # 进行中的异步任务（同一检查/同一地址的下载只执行一次，并发调用共享同一个 Future）
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # 同一时间只允许一个下载写入下载目录，避免并发写同一个文件
+        self._download_lock = threading.Lock()
         
-    def check_for_updates(self):
+    def _get_cache_path(self):
+        """更新检查缓存文件（随统一管理文件夹迁移，每次按当前配置目录计算）"""
+        return os.path.join(self.config_manager.get_config_dir(), "update_check.json")
+
+    def _load_release_cache(self):
+        """读取上次检查到的 release 信息，读取失败时返回空字典"""
+        try:
+            with open(self._get_cache_path(), 'rb') as f:
+                cache = json_loads(f.read())
+            return cache if isinstance(cache, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_release_cache(self, cache):
+        try:
+            atomic_write_json(self._get_cache_path(), cache)
+        except Exception as e:
+            self.logger.warning(f"Failed to save update check cache: {e}")
+
+    def _release_result(self, release):
+        """根据 release 信息生成 check_for_updates 的返回值"""
+        latest_tag = release.get("tag_name", "")
+        download_url = release.get("download_url")
+        if not download_url:
+            self.logger.warning("No executable asset found in release.")
+            return False, latest_tag, "未找到可执行文件", None
+        if _is_newer_version(latest_tag):
+            return True, latest_tag, release.get("body", ""), download_url
+        return False, latest_tag, release.get("body", ""), None
+
+    def _record_rate_limit(self, response):
+        """记录 GitHub 返回的剩余请求额度和重置时间"""
+        try:
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                self._rl_remaining = int(remaining)
+                self._rl_reset = int(response.headers.get("X-RateLimit-Reset", 0))
+            if response.status_code in (403, 429):
+                # Retry-After 为秒数，优先于 X-RateLimit-Reset
+                retry_after = response.headers.get("Retry-After")
+                if retry_after is not None:
+                    self._rl_remaining = 0
+                    self._rl_reset = max(self._rl_reset, int(time.time()) + int(retry_after))
+        except ValueError:
+            pass
+
+    def _rate_limited_result(self, cache):
+        """额度用尽时的返回值：有缓存则用缓存，否则返回提示信息"""
+        wait_minutes = max(1, int(self._rl_reset - time.time() + 59) // 60)
+        self.logger.warning(f"GitHub API rate limit reached, retry in about {wait_minutes} min.")
+        if cache.get("tag_name") is not None:
+            return self._release_result(cache)
+        return False, None, f"GitHub API 请求次数已达上限，请约 {wait_minutes} 分钟后再试", None
+
+    def check_for_updates(self, force=False):
         """检查更新
+
+        上次检查在 check_ttl_seconds（force=True 时为 force_check_ttl_seconds）内时
+        直接返回缓存结果；
+        否则使用 ETag/Last-Modified 条件请求：release 未变化时 GitHub 返回 304
+        （无响应体，且不计入匿名访问频率限制），直接使用本地缓存的结果。
+
         Returns:
             tuple: (has_update, version, body, download_url)
         """
         try:
+            cache = self._load_release_cache()
+            ttl = self.force_check_ttl_seconds if force else self.check_ttl_seconds
+            if (cache.get("tag_name") is not None
+                    and 0 <= time.time() - cache.get("checked_at", 0) < ttl):
+                self.logger.info("Using cached update check result.")
+                return self._release_result(cache)
+            
+            if self._rl_remaining == 0 and time.time() < self._rl_reset:
+                return self._rate_limited_result(cache)
+            
             self.logger.info(f"Checking for updates from {self.github_api_url}...")
-            response = requests.get(self.github_api_url, timeout=10)
+            headers = {}
+            if cache.get("tag_name") is not None:
+                if cache.get("etag"):
+                    headers["If-None-Match"] = cache["etag"]
+                if cache.get("last_modified"):
+                    headers["If-Modified-Since"] = cache["last_modified"]
+            
+            response = SESSION.get(self.github_api_url, headers=headers, timeout=10)
+            self._record_rate_limit(response)
+            if response.status_code in (403, 429) and self._rl_remaining == 0:
+                return self._rate_limited_result(cache)
+            if response.status_code == 304:
+                self.logger.info("Release info not modified, using cached result.")
+                cache["checked_at"] = time.time()
+                self._save_release_cache(cache)
+                return self._release_result(cache)
+            
             response.raise_for_status()
-            data = response.json()
-            
-            latest_tag = data.get("tag_name", "").lstrip("v")
-            body = data.get("body", "")
-            assets = data.get("assets", [])
-            
-            # 查找 exe 下载链接
-            download_url = None
-            for asset in assets:
-                if asset.get("name", "").endswith(".exe"):
-                    download_url = asset.get("browser_download_url")
-                    break
-            
-            if not download_url:
-                self.logger.warning("No executable asset found in release.")
-                return False, latest_tag, "未找到可执行文件", None
-                
-            if self._compare_versions(latest_tag, APP_VERSION) > 0:
-                return True, latest_tag, body, download_url
-            else:
-                return False, latest_tag, body, None
+            # 直接解析原始字节（orjson 可用时走 C 实现），跳过 requests 的编码探测
+            data = json_loads(response.content)
+            
+            # 查找 exe 下载链接（结果随 release 信息一起缓存，304/TTL 命中时无需再扫描）
+            download_url = next(
+                (asset.get("browser_download_url") for asset in data.get("assets", [])
+                 if asset.get("name", "").endswith(".exe")),
+                None
+            )
+            
+            release = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "tag_name": data.get("tag_name", "").lstrip("v"),
+                "body": data.get("body", ""),
+                "download_url": download_url,
+                "checked_at": time.time()
+            }
+            self._save_release_cache(release)
+            return self._release_result(release)
                 
         except Exception as e:
             self.logger.error(f"Failed to check for updates: {e}")
             return False, None, str(e), None
 
-    def _compare_versions(self, v1, v2):
-        """比较版本号 v1 和 v2。 v1 > v2 返回 1, v1 < v2 返回 -1, 相等返回 0"""
-        def parse(v):
-            try:
-                return [int(x) for x in v.split('.')]
-            except:
-                return [0]
-            
-        try:
-            p1 = parse(v1)
-            p2 = parse(v2)
-            
-            # 补齐长度
-            max_len = max(len(p1), len(p2))
-            p1.extend([0] * (max_len - len(p1)))
-            p2.extend([0] * (max_len - len(p2)))
-            
-            if p1 > p2: return 1
-            if p1 < p2: return -1
-            return 0
-        except:
-            return 0
+    def _submit_once(self, key, func, *args):
+        """提交后台任务；相同 key 的任务仍在进行时直接返回它的 Future"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = _run_in_background(func, *args)
+            self._inflight[key] = future
+        
+        def _done(f):
+            with self._inflight_lock:
+                if self._inflight.get(key) is f:
+                    del self._inflight[key]
+        future.add_done_callback(_done)
+        return future
+
+    def check_for_updates_async(self, force=False):
+        """在后台线程检查更新，返回 Future，结果同 check_for_updates"""
+        return self._submit_once(("check", force), self.check_for_updates, force)
+
+    def download_update_async(self, url, progress_callback=None):
+        """在后台线程下载更新，返回 Future，结果为保存路径（失败时 result() 抛出异常）
+
+        同一地址已在下载时返回进行中的 Future，此时 progress_callback 不会被调用。
+        """
+        return self._submit_once(("download", url), self.download_update, url, progress_callback)
 
     def download_update(self, url, progress_callback=None):
-        """下载更新"""
+        """下载更新
+
+        服务器支持 Range 请求时分块并行下载，否则（或并行下载失败时）单连接流式下载。
+        下载完成后在 <文件>.sha256 中记录来源地址和 SHA-256；再次下载同一地址时，
+        若本地文件校验一致则直接复用。并发调用按顺序执行，后到的调用直接复用已校验的文件。
+        """
+        with self._download_lock:
+            return self._download_update(url, progress_callback)
+
+    def _download_update(self, url, progress_callback=None):
         try:
             save_dir = self.config_manager.get_downloads_dir()
-            if not os.path.exists(save_dir):
-                os.makedirs(save_dir)
+            os.makedirs(save_dir, exist_ok=True)
                 
             filename = url.split("/")[-1]
             save_path = os.path.join(save_dir, f"update_{filename}")
             
+            # 无论网速和分块数量如何，界面每秒最多刷新约10次
+            if progress_callback:
+                progress_callback = _throttle_progress(progress_callback)
+            
+            if self._verify_cached_download(url, save_path):
+                self.logger.info(f"Reusing verified update file: {save_path}")
+                if progress_callback:
+                    progress_callback(100)
+                return save_path
+            
             self.logger.info(f"Downloading update from {url} to {save_path}...")
             
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
+            # 先用 HEAD 获取文件大小和 Range 支持情况（GitHub 下载链接会重定向，取最终地址）
+            try:
+                total_size, accept_ranges, final_url = probe_download(url)
+            except Exception as e:
+                self.logger.warning(f"HEAD request failed, using single-stream download: {e}")
+                total_size, accept_ranges, final_url = 0, False, url
+            
+            # 下载先写入 .part，完成后才改名，因此已存在的 save_path 一定是完整下载的文件；
+            # 没有校验记录（如写记录前程序退出）但大小与服务器一致时直接复用
+            if total_size > 0 and os.path.isfile(save_path) and os.path.getsize(save_path) == total_size:
+                self.logger.info(f"Reusing downloaded update file: {save_path}")
+                self._save_digest(url, save_path, file_sha256(save_path))
+                if progress_callback:
+                    progress_callback(100)
+                return save_path
             
-            total_size = int(response.headers.get('content-length', 0))
-            block_size = 8192
-            downloaded_size = 0
-            
-            with open(save_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=block_size):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        if progress_callback and total_size > 0:
-                            progress = (downloaded_size / total_size) * 100
-                            progress_callback(progress)
-                            
+            part_path = save_path + ".part"
+            # 上次单连接下载中断留下的部分文件，服务器支持 Range 时续传
+            can_resume = (accept_ranges and os.path.isfile(part_path)
+                          and 0 < os.path.getsize(part_path) < total_size)
+            digest = None
+            if accept_ranges and total_size >= self.parallel_min_size and not can_resume:
+                try:
+                    self.logger.info(f"Downloading {total_size} bytes in parallel ranges...")
+                    download_ranges(final_url, part_path, total_size, progress_callback,
+                                    workers=self.download_workers, parts=8)
+                    # 分块乱序写入，下载完成后再整体计算摘要
+                    digest = file_sha256(part_path)
+                except Exception as e:
+                    self.logger.warning(f"Parallel download failed, retrying with single stream: {e}")
+            
+            if digest is None:
+                digest = self._download_stream(url, part_path, progress_callback, resume=can_resume)
+            os.replace(part_path, save_path)
+            self._save_digest(url, save_path, digest)
             return save_path
         except Exception as e:
             self.logger.error(f"Download failed: {e}")
             raise
 
-    def perform_update(self, new_exe_path):
-        """执行更新替换"""
+    def _save_digest(self, url, save_path, digest):
+        try:
+            atomic_write_json(save_path + ".sha256", {"url": url, "sha256": digest})
+        except Exception as e:
+            self.logger.warning(f"Failed to save update checksum: {e}")
+
+    def _verify_cached_download(self, url, save_path):
+        """已下载的文件来自同一地址且 SHA-256 与记录一致时返回 True"""
+        digest_path = save_path + ".sha256"
+        if not (os.path.isfile(save_path) and os.path.isfile(digest_path)):
+            return False
+        try:
+            with open(digest_path, 'rb') as f:
+                record = json_loads(f.read())
+            return record.get("url") == url and record.get("sha256") == file_sha256(save_path)
+        except Exception:
+            return False
+
+    def _download_stream(self, url, save_path, progress_callback=None, resume=False):
+        """单连接流式下载，边写边计算 SHA-256，返回十六进制摘要
+
+        resume=True 时若 save_path 已有部分内容，用 Range 请求只下载剩余部分并追加；
+        服务器不支持（返回200）时从头下载。
+        """
+        h = hashlib.sha256()
+        resume_pos = os.path.getsize(save_path) if resume and os.path.isfile(save_path) else 0
+        headers = {"Range": f"bytes={resume_pos}-"} if resume_pos > 0 else {}
+        
+        response = SESSION.get(url, stream=True, headers=headers, timeout=30)
+        response.raise_for_status()
+        
+        if resume_pos > 0 and response.status_code == 206:
+            self.logger.info(f"Resuming update download from byte {resume_pos}")
+            mode = 'ab'
+            # 已下载部分先计入摘要
+            with open(save_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    h.update(block)
+        else:
+            resume_pos = 0
+            mode = 'wb'
+        
+        total_size = int(response.headers.get('content-length', 0))
+        if total_size > 0:
+            total_size += resume_pos
+        block_size = 1 << 20  # 1 MiB，减少Python层循环次数
+        downloaded_size = resume_pos
+        # 每下载1%或512 KiB（取较大者）回调一次，避免频繁刷新界面
+        notify_every = max(total_size // 100, 512 * 1024)
+        next_notify = downloaded_size + notify_every
+        
+        # 不预分配：中断后文件大小即已下载字节数，下次可据此续传
+        with open(save_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=block_size):
+                f.write(chunk)
+                h.update(chunk)
+                downloaded_size += len(chunk)
+                if progress_callback and total_size > 0 and downloaded_size >= next_notify:
+                    progress_callback(min(downloaded_size * 100 // total_size, 100))
+                    next_notify = downloaded_size + notify_every
+        
+        if total_size > 0 and downloaded_size < total_size:
+            raise IOError(f"Incomplete download: {downloaded_size}/{total_size}")
+        if progress_callback:
+            progress_callback(100)
+        return h.hexdigest()
+
+    def perform_update(self, new_exe_path, new_version=None):
+        """执行更新替换
+
+        新版本包含 --apply-update 模式（见 core.update_runner）时直接启动新exe，
+        由它等待当前进程退出、替换程序文件并重新启动；
+        旧版本或版本未知时回退到批处理 + PowerShell 脚本替换。
+        """
         try:
             current_exe = sys.executable
             
@@ -117,81 +488,27 @@ class Updater:
             if not os.path.exists(new_exe_path):
                 return False, f"新版本文件不存在: {new_exe_path}"
             
-            current_dir = os.path.dirname(current_exe)
-            current_name = os.path.basename(current_exe)
-            old_exe_backup = os.path.join(current_dir, f"{current_name}.old")
-            
-            # 获取当前进程ID
-            current_pid = os.getpid()
-            
             # 规范化路径，确保使用绝对路径
             current_exe = os.path.abspath(current_exe)
             new_exe_path = os.path.abspath(new_exe_path)
-            old_exe_backup = os.path.abspath(old_exe_backup)
-            
-            # 转义路径中的特殊字符，使用单引号包裹（PowerShell 单引号是字面量）
-            def escape_ps_path(path):
-                # 将反斜杠转换为正斜杠，或使用单引号
-                # PowerShell 中单引号内的内容会被视为字面量
-                return path.replace("'", "''")  # 单引号需要转义为两个单引号
-            
-            current_exe_escaped = escape_ps_path(current_exe)
-            new_exe_escaped = escape_ps_path(new_exe_path)
-            old_backup_escaped = escape_ps_path(old_exe_backup)
-            
-            # 直接在批处理中使用 PowerShell 内联代码，避免路径编码问题
-            # 使用静默模式，不显示终端窗口
-            bat_path = os.path.join(current_dir, "update_installer.bat")
-            with open(bat_path, 'w', encoding='gbk') as f:
-                f.write('@echo off\n')
-                f.write('chcp 65001 > NUL 2>&1\n')  # 设置 UTF-8 编码，静默
-                # 使用 -WindowStyle Hidden 隐藏 PowerShell 窗口
-                f.write('powershell.exe -ExecutionPolicy Bypass -WindowStyle Hidden -Command "')
-                f.write('$ErrorActionPreference = \\"Stop\\"; ')
-                # 使用单引号包裹路径，避免转义问题
-                f.write(f"$currentExe = '{current_exe_escaped}'; ")
-                f.write(f"$newExe = '{new_exe_escaped}'; ")
-                f.write(f"$oldBackup = '{old_backup_escaped}'; ")
-                f.write(f'$currentPid = {current_pid}; ')
-                # 移除所有 Write-Host，静默执行
-                f.write('try { $process = Get-Process -Id $currentPid -ErrorAction SilentlyContinue; ')
-                f.write('if ($process) { $process.CloseMainWindow() | Out-Null; Start-Sleep -Seconds 2; ')
-                f.write('if (-not $process.HasExited) { Stop-Process -Id $currentPid -Force -ErrorAction Stop } } } ')
-                f.write('catch { }; ')  # 静默处理错误
-                f.write('$maxWait = 30; $waited = 0; ')
-                f.write('while ($waited -lt $maxWait) { $process = Get-Process -Id $currentPid -ErrorAction SilentlyContinue; ')
-                f.write('if (-not $process) { break }; Start-Sleep -Seconds 1; $waited++ }; ')
-                f.write('$process = Get-Process -Id $currentPid -ErrorAction SilentlyContinue; ')
-                f.write('if ($process) { Stop-Process -Id $currentPid -Force -ErrorAction SilentlyContinue; Start-Sleep -Seconds 2 }; ')
-                f.write('Start-Sleep -Seconds 2; ')  # 等待文件释放
-                f.write('$currentDir = Split-Path -Parent $currentExe; ')
-                f.write('if (-not (Test-Path $currentDir)) { New-Item -ItemType Directory -Path $currentDir -Force | Out-Null }; ')
-                f.write('if (-not (Test-Path $newExe)) { throw \\"新版本文件不存在\\" }; ')
-                f.write('try { if (Test-Path $currentExe) { ')
-                f.write('$retryCount = 0; $maxRetries = 5; ')
-                f.write('while ($retryCount -lt $maxRetries) { try { Move-Item -Path $currentExe -Destination $oldBackup -Force -ErrorAction Stop; break } ')
-                f.write('catch { $retryCount++; if ($retryCount -ge $maxRetries) { throw $_ }; Start-Sleep -Seconds 1 } } }; ')
-                f.write('Move-Item -Path $newExe -Destination $currentExe -Force -ErrorAction Stop; ')
-                f.write('if (Test-Path $oldBackup) { Remove-Item -Path $oldBackup -Force -ErrorAction SilentlyContinue }; ')
-                f.write('if (-not (Test-Path $currentExe)) { throw \\"更新后的文件不存在\\" }; ')
-                f.write('$exeDir = Split-Path -Parent $currentExe; ')
-                f.write('try { Start-Process -FilePath $currentExe -WorkingDirectory $exeDir -WindowStyle Hidden -ErrorAction Stop | Out-Null } ')
-                f.write('catch { try { Push-Location $exeDir; cmd /c start \\"\\" \\"$currentExe\\"; Pop-Location } catch { throw \\"无法启动新版本\\" } } } ')
-                f.write('catch { if (Test-Path $oldBackup) { Move-Item -Path $oldBackup -Destination $currentExe -Force -ErrorAction SilentlyContinue }; ')
-                # 只有出错时才显示错误窗口
-                f.write('$wshell = New-Object -ComObject WScript.Shell; ')
-                f.write('$wshell.Popup(\\"更新失败: $_\\", 0, \\"更新错误\\", 0x10); exit 1 }"\n')
-                f.write('if %errorlevel% equ 0 (\n')
-                f.write('    timeout /t 1 /nobreak > NUL 2>&1\n')
-                f.write('    del /F /Q "%~f0" > NUL 2>&1\n')
-                f.write(')\n')
-            
-            self.logger.info(f"Starting update script: {bat_path}")
+            old_exe_backup = f"{current_exe}.old"
+            
             self.logger.info(f"Current exe: {current_exe}")
             self.logger.info(f"New exe: {new_exe_path}")
             
-            # 使用 CREATE_NO_WINDOW 标志静默执行，不显示批处理窗口
-            subprocess.Popen([bat_path], shell=True, cwd=current_dir, creationflags=0x08000000)
+            if not _supports_update_runner(new_version):
+                # 不含 --apply-update 的exe会直接以普通模式启动而不替换文件，改用脚本
+                self.logger.info(f"Version {new_version} has no update runner, using update script")
+                self._launch_update_script(current_exe, new_exe_path, old_exe_backup)
+                return True, "正在重启以完成更新..."
+            
+            self.logger.info(f"Starting update runner: {new_exe_path}")
+            # 参数以列表传递，路径中的空格、引号等无需转义；DETACHED_PROCESS 使其在本进程退出后继续运行
+            subprocess.Popen(
+                [new_exe_path, "--apply-update", str(os.getpid()), current_exe, old_exe_backup],
+                cwd=os.path.dirname(new_exe_path), close_fds=True,
+                creationflags=subprocess.DETACHED_PROCESS
+            )
             
             return True, "正在重启以完成更新..."
             
@@ -199,3 +516,41 @@ class Updater:
             self.logger.error(f"Update failed: {e}")
             return False, str(e)
 
+    def _launch_update_script(self, current_exe, new_exe_path, old_exe_backup):
+        """用批处理 + PowerShell 脚本替换程序（新版本不支持 --apply-update 或版本未知时使用）
+
+        脚本等待当前进程退出（超时则强制结束）、替换exe并重新启动，失败时弹窗提示并还原旧版本。
+        """
+        current_dir = os.path.dirname(current_exe)
+        current_pid = os.getpid()
+        
+        # 转义路径中的特殊字符，使用单引号包裹（PowerShell 单引号是字面量）
+        def escape_ps_path(path):
+            # 将反斜杠转换为正斜杠，或使用单引号
+            # PowerShell 中单引号内的内容会被视为字面量
+            return path.replace("'", "''")  # 单引号需要转义为两个单引号
+        
+        current_exe_escaped = escape_ps_path(current_exe)
+        new_exe_escaped = escape_ps_path(new_exe_path)
+        old_backup_escaped = escape_ps_path(old_exe_backup)
+        
+        # 直接在批处理中使用 PowerShell 内联代码，避免路径编码问题
+        # 使用静默模式，不显示终端窗口
+        bat_path = os.path.join(current_dir, "update_installer.bat")
+        # 以UTF-8写入：chcp 65001 之后的行按UTF-8解析，中文路径/提示才不会乱码
+        # （chcp 之前的行都是纯ASCII）
+        content = _UPDATE_SCRIPT.substitute(
+            current_exe=current_exe_escaped,
+            new_exe=new_exe_escaped,
+            old_backup=old_backup_escaped,
+            current_pid=current_pid,
+        )
+        with open(bat_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        self.logger.info(f"Starting update script: {bat_path}")
+        
+        # 直接启动批处理（无需 shell=True 再套一层 cmd.exe），
+        # 使用 CREATE_NO_WINDOW 标志静默执行，不显示批处理窗口
+        subprocess.Popen([bat_path], cwd=current_dir, close_fds=True,
+                         creationflags=subprocess.CREATE_NO_WINDOW)
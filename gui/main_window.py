@@ -7,17 +7,54 @@ from core.history import HistoryManager
 from core.config import ConfigManager
 from core.updater import Updater
 from core.version import APP_VERSION
+import collections
+import importlib
 import threading
+from operator import itemgetter
 import os
 import json
 import time
 
 class MainWindow:
+    # Environment name -> (module, class) of its installer; imported on first use
+    INSTALLER_CLASSES = {
+        "JDK": ("impl.jdk", "JDKInstaller"),
+        "Node.js": ("impl.node", "NodeInstaller"),
+        "Maven": ("impl.maven", "MavenInstaller"),
+        "Redis": ("impl.redis", "RedisInstaller"),
+        "Python": ("impl.python", "PythonInstaller")
+    }
+    _installer_cls_cache = {}
+    # History table columns: (column id, history record key, heading, width)
+    HISTORY_COLUMNS = (
+        ("env", "env", "环境", 100),
+        ("version", "version", "版本", 150),
+        ("path", "path", "路径", 400),
+        ("date", "install_time", "安装时间", 180),
+    )
+    # Builds a Treeview row tuple from a history record
+    _history_row = itemgetter(*(key for _, key, _, _ in HISTORY_COLUMNS))
+
     def __init__(self):
         self.logger = Logger()
         self.history_manager = HistoryManager()
         self.config_manager = ConfigManager()
         self.updater = Updater(self.config_manager)
+        # Incremented per version-list load; results of older loads are dropped
+        self._versions_req_id = 0
+        self._env_change_after_id = None
+        # HistoryManager.revision the history list was last built from
+        self._history_revision = None
+        self._history_insert_after_id = None
+        # 设置页信息文本对应的统一管理文件夹路径
+        self._settings_info_path = None
+        # Starting folder for the browse dialogs; set from the last chosen path so
+        # opening a dialog never has to stat a possibly slow (network) drive
+        self._last_browse_dir = os.path.expanduser("~")
+        # Log lines from any thread are buffered and written to the log widget in batches
+        self._log_buffer = collections.deque()
+        self._log_lock = threading.Lock()
+        self._log_flush_scheduled = False
         
         self.root = ttk.Window(themename="cosmo")
         self.root.title(f"DevEnv OneClick Installer v{APP_VERSION}")
@@ -28,8 +65,13 @@ class MainWindow:
         self._init_ui()
         self._init_menu()
         
-        # Check for first run after update
-        self.root.after(1000, self._check_first_run_after_update)
+        # Check for first run after update. The release-notes request starts right
+        # away so it overlaps with the initial version list load.
+        self._check_first_run_after_update()
+        
+        # Import the remaining installer modules off the UI thread so the first
+        # environment switch does not pay for it
+        threading.Thread(target=self._prewarm_installers, daemon=True).start()
         
     def _init_menu(self):
         menubar = tk.Menu(self.root)
@@ -61,53 +103,55 @@ class MainWindow:
             
             # 如果 GitHub 上最新的 tag 与当前运行版本一致，显示该 release notes
             if latest_tag and latest_tag.lstrip('v') == current_version.lstrip('v'):
-                def _show():
-                    # 创建一个简单的弹窗显示日志
-                    top = ttk.Toplevel(self.root)
-                    top.title(f"版本更新 v{current_version}")
-                    top.geometry("600x400")
-                    # Center
-                    x = self.root.winfo_x() + (self.root.winfo_width() // 2) - 300
-                    y = self.root.winfo_y() + (self.root.winfo_height() // 2) - 200
-                    top.geometry(f"+{x}+{y}")
-                    
-                    ttk.Label(top, text=f"欢迎使用新版本 v{current_version}！", font=("微软雅黑", 12, "bold")).pack(pady=10)
-                    ttk.Label(top, text="更新日志:", anchor="w").pack(fill=X, padx=10)
-                    
-                    text_frame = ttk.Frame(top)
-                    text_frame.pack(fill=BOTH, expand=YES, padx=10, pady=5)
-                    
-                    text = tk.Text(text_frame, height=10, font=("Consolas", 10))
-                    text.pack(side=LEFT, fill=BOTH, expand=YES)
-                    text.insert(END, body)
-                    text.configure(state="disabled")
-                    
-                    scroll = ttk.Scrollbar(text_frame, orient="vertical", command=text.yview)
-                    scroll.pack(side=RIGHT, fill=Y)
-                    text.configure(yscrollcommand=scroll.set)
-                    
-                    ttk.Button(top, text="确定", command=top.destroy).pack(pady=10)
-                    
-                self.root.after(0, _show)
+                self.root.after(0, self._show_release_notes_ui, current_version, body)
             else:
                  self.root.after(0, lambda: messagebox.showinfo("更新成功", f"欢迎使用新版本 v{current_version}！"))
         except:
              self.root.after(0, lambda: messagebox.showinfo("更新成功", f"欢迎使用新版本 v{current_version}！"))
 
+    def _show_release_notes_ui(self, current_version, body):
+        # 创建一个简单的弹窗显示日志
+        top = ttk.Toplevel(self.root)
+        top.title(f"版本更新 v{current_version}")
+        top.geometry("600x400")
+        # Center (检查在启动时即开始，主窗口可能尚未完成布局)
+        self.root.update_idletasks()
+        x = self.root.winfo_x() + (self.root.winfo_width() // 2) - 300
+        y = self.root.winfo_y() + (self.root.winfo_height() // 2) - 200
+        top.geometry(f"+{x}+{y}")
+        
+        ttk.Label(top, text=f"欢迎使用新版本 v{current_version}！", font=("微软雅黑", 12, "bold")).pack(pady=10)
+        ttk.Label(top, text="更新日志:", anchor="w").pack(fill=X, padx=10)
+        
+        text_frame = ttk.Frame(top)
+        text_frame.pack(fill=BOTH, expand=YES, padx=10, pady=5)
+        
+        text = tk.Text(text_frame, height=10, font=("Consolas", 10))
+        text.pack(side=LEFT, fill=BOTH, expand=YES)
+        text.insert(END, body)
+        text.configure(state="disabled")
+        
+        scroll = ttk.Scrollbar(text_frame, orient="vertical", command=text.yview)
+        scroll.pack(side=RIGHT, fill=Y)
+        text.configure(yscrollcommand=scroll.set)
+        
+        ttk.Button(top, text="确定", command=top.destroy).pack(pady=10)
+
     def _check_update(self):
         """手动检查更新"""
         self.logger.info("正在检查更新...")
-        threading.Thread(target=self._do_check_update, daemon=True).start()
+        # 手动检查只复用10分钟内的结果，否则访问GitHub（仍可命中304）
+        self.updater.check_for_updates_async(force=True).add_done_callback(self._do_check_update)
 
-    def _do_check_update(self):
+    def _do_check_update(self, future):
         try:
-            has_update, version, body, download_url = self.updater.check_for_updates()
+            has_update, version, body, download_url = future.result()
             
             def _on_result():
                 if has_update:
                     msg = f"发现新版本: v{version}\n\n更新内容:\n{body}\n\n是否立即更新？"
                     if messagebox.askyesno("发现新版本", msg):
-                        self._start_update_download(download_url)
+                        self._start_update_download(download_url, version)
                 else:
                     messagebox.showinfo("检查更新", f"当前已是最新版本 (v{APP_VERSION})")
                     self.logger.info("当前已是最新版本。")
@@ -116,7 +160,7 @@ class MainWindow:
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("错误", f"检查更新失败: {e}"))
 
-    def _start_update_download(self, url):
+    def _start_update_download(self, url, version=None):
         """开始下载更新"""
         # 显示进度弹窗
         progress_win = ttk.Toplevel(self.root)
@@ -138,10 +182,15 @@ class MainWindow:
         def _update_pb(val):
             pb['value'] = val
             status_lbl.configure(text=f"{int(val)}%")
+        
+        def _on_progress(val):
+            # Updater 已将进度回调限制为每秒约10次；after(0) 按顺序执行，
+            # 不会晚于下载完成后销毁窗口的回调
+            self.root.after(0, _update_pb, val)
             
         def _download_task():
             try:
-                save_path = self.updater.download_update(url, lambda v: self.root.after(0, _update_pb, v))
+                save_path = self.updater.download_update(url, _on_progress)
                 self.root.after(0, lambda: _on_download_complete(save_path))
             except Exception as e:
                 self.root.after(0, lambda: messagebox.showerror("更新失败", f"下载失败: {e}"))
@@ -151,7 +200,7 @@ class MainWindow:
             progress_win.destroy()
             if messagebox.askyesno("下载完成", "新版本下载完成，是否立即重启进行安装？\n\n程序将自动关闭并完成更新。"):
                 # 先启动更新脚本
-                success, msg = self.updater.perform_update(save_path)
+                success, msg = self.updater.perform_update(save_path, version)
                 if success:
                     # 延迟关闭窗口，确保更新脚本已启动
                     def _close_app():
@@ -266,6 +315,8 @@ class MainWindow:
         self.config_frame = ttk.Labelframe(content_frame, text="高级配置", padding=10)
         self.config_frame.grid(row=5, column=0, columnspan=2, sticky=EW, padx=5, pady=10)
         self.config_widgets = {}
+        # env -> (panel frame, {key: tk variable}), built on first use
+        self._config_panels = {}
         
         # Action Buttons
         action_frame_btn = ttk.Frame(content_frame)
@@ -280,17 +331,11 @@ class MainWindow:
         history_frame.pack(fill=BOTH, expand=YES, padx=10, pady=10)
         
         # History Treeview
-        columns = ("env", "version", "path", "date")
+        columns = tuple(cid for cid, _, _, _ in self.HISTORY_COLUMNS)
         self.history_tree = ttk.Treeview(history_frame, columns=columns, show="headings", height=15)
-        self.history_tree.heading("env", text="环境")
-        self.history_tree.heading("version", text="版本")
-        self.history_tree.heading("path", text="路径")
-        self.history_tree.heading("date", text="安装时间")
-        
-        self.history_tree.column("env", width=100)
-        self.history_tree.column("version", width=150)
-        self.history_tree.column("path", width=400)
-        self.history_tree.column("date", width=180)
+        for cid, _, text, width in self.HISTORY_COLUMNS:
+            self.history_tree.heading(cid, text=text)
+            self.history_tree.column(cid, width=width)
         
         self.history_tree.pack(side=LEFT, fill=BOTH, expand=YES)
         
@@ -346,11 +391,15 @@ class MainWindow:
         """Handle tab change event"""
         selected_tab = self.notebook.index(self.notebook.select())
         if selected_tab == 1:  # History tab
-            self._load_history_list()
+            # Only rebuild the list if the records changed since it was last shown
+            if self.history_manager.revision != self._history_revision:
+                self._load_history_list()
         elif selected_tab == 2:  # Settings tab
             self._update_settings_info()
-            # 更新路径输入框的值
-            self.manager_path_var.set(self.config_manager.get_manager_folder_path())
+            # 更新路径输入框的值（相同则不写回，避免触发变量跟踪和重绘）
+            manager_path = self.config_manager.get_manager_folder_path()
+            if self.manager_path_var.get() != manager_path:
+                self.manager_path_var.set(manager_path)
 
     def _on_mode_change(self):
         mode = self.action_var.get()
@@ -360,7 +409,7 @@ class MainWindow:
             self.path_lbl.configure(text="安装目录:")
             self.path_entry.configure(state="readonly")
             self.tip_label.configure(text="提示: 所有环境统一安装在DevEnvManager/apps目录下，路径固定不可修改")
-            self._on_env_change(None)
+            self._apply_env_change()
             self.action_btn.configure(text="开始安装", bootstyle=SUCCESS)
         else:
             self.version_lbl.grid_remove()
@@ -376,16 +425,23 @@ class MainWindow:
     
     def _load_history_list(self):
         """Load and display all installation history records"""
-        # Clear existing
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
+        self._history_revision = self.history_manager.revision
+        # Drop any rows still queued from a previous load
+        if self._history_insert_after_id is not None:
+            self.root.after_cancel(self._history_insert_after_id)
+            self._history_insert_after_id = None
+        # Clear existing in a single Tk call
+        children = self.history_tree.get_children()
+        if children:
+            self.history_tree.delete(*children)
             
         try:
+            # Records are served from HistoryManager's in-memory index, so this
+            # needs no disk I/O and stays on the UI thread
             records = self.history_manager.get_records()
             self.logger.info(f"Loading {len(records)} history records...")
             
-            for r in records:
-                self.history_tree.insert("", END, values=(r['env'], r['version'], r['path'], r['install_time']))
+            self._insert_history_rows(records, 0)
             
             if len(records) > 0:
                 self.logger.info(f"Successfully loaded {len(records)} history records")
@@ -394,6 +450,20 @@ class MainWindow:
         except Exception as e:
             self.logger.error(f"Failed to load history: {e}")
 
+    # Rows inserted per event-loop turn so long histories do not freeze the UI
+    HISTORY_INSERT_CHUNK = 200
+
+    def _insert_history_rows(self, records, start):
+        """Insert one chunk of history rows, then yield to the event loop for the rest"""
+        self._history_insert_after_id = None
+        end = start + self.HISTORY_INSERT_CHUNK
+        insert = self.history_tree.insert
+        row = self._history_row
+        for r in records[start:end]:
+            insert("", END, values=row(r))
+        if end < len(records):
+            self._history_insert_after_id = self.root.after(1, self._insert_history_rows, records, end)
+
     def _on_history_select(self, event):
         """Handle history item selection - only auto-fill if in install tab, no auto-switch on single click"""
         selection = self.history_tree.selection()
@@ -433,13 +503,22 @@ class MainWindow:
             self.notebook.select(2)  # 切换到设置标签页
         else:
             # 卸载模式下，允许选择目录
-            current_path = self.path_var.get()
-            initial_dir = os.path.dirname(current_path) if current_path and os.path.exists(current_path) else os.path.expanduser("~")
-            path = filedialog.askdirectory(initialdir=initial_dir, title="选择要卸载的环境目录")
-        if path:
-            self.path_var.set(path)
+            path = filedialog.askdirectory(initialdir=self._last_browse_dir, title="选择要卸载的环境目录")
+            if path:
+                self._last_browse_dir = os.path.dirname(path)
+                self.path_var.set(path)
 
     def _on_env_change(self, event):
+        # Debounce: arrowing through the combobox only applies the final choice
+        if self._env_change_after_id is not None:
+            self.root.after_cancel(self._env_change_after_id)
+        self._env_change_after_id = self.root.after(150, self._apply_env_change)
+
+    def _apply_env_change(self):
+        # Also called directly (mode switch); a still-pending debounced call would repeat the work
+        if self._env_change_after_id is not None:
+            self.root.after_cancel(self._env_change_after_id)
+            self._env_change_after_id = None
         env = self.env_var.get()
         self._load_versions(env)
         self._update_config_ui(env)
@@ -453,11 +532,9 @@ class MainWindow:
     
     def _browse_manager_path(self):
         """浏览选择统一管理文件夹"""
-        current_path = self.manager_path_var.get()
-        initial_dir = os.path.dirname(current_path) if os.path.exists(current_path) else os.path.expanduser("~")
-        
-        path = filedialog.askdirectory(initialdir=initial_dir, title="选择统一管理文件夹")
+        path = filedialog.askdirectory(initialdir=self._last_browse_dir, title="选择统一管理文件夹")
         if path:
+            self._last_browse_dir = os.path.dirname(path)
             self.manager_path_var.set(path)
     
     def _save_manager_path(self):
@@ -491,6 +568,8 @@ class MainWindow:
         success, message = self.config_manager.set_manager_folder_path(new_path, migrate_files=True)
         
         if success:
+            # 迁移后历史文件位于新位置，且其中的路径已更新
+            self.history_manager.reload(self.config_manager.get_history_file())
             self.logger.info(f"迁移成功: {message}")
             messagebox.showinfo("成功", f"统一管理文件夹迁移成功！\n\n{message}\n\n" \
                                       f"新路径: {new_path}\n\n" \
@@ -507,101 +586,116 @@ class MainWindow:
     def _update_settings_info(self):
         """更新设置信息显示"""
         manager_path = self.config_manager.get_manager_folder_path()
+        # 显示内容只取决于统一管理文件夹路径，路径未变时文本框已是最新内容
+        if manager_path == self._settings_info_path:
+            return
+        self._settings_info_path = manager_path
         manager_name = self.config_manager.get_manager_folder_name()
         
-        info_text = f"统一管理文件夹名称: {manager_name}\n"
-        info_text += f"完整路径: {manager_path}\n\n"
-        info_text += "程序目录结构:\n"
-        info_text += f"  • 下载目录: {self.config_manager.get_downloads_dir()}\n"
-        info_text += f"  • 日志目录: {self.config_manager.get_logs_dir()}\n"
-        info_text += f"  • 配置目录: {self.config_manager.get_config_dir()}\n"
-        info_text += f"  • 应用目录: {self.config_manager.get_apps_dir()}\n"
-        info_text += f"  • 配置文件: {self.config_manager.get_config_file()}\n"
-        info_text += f"  • 历史记录: {self.config_manager.get_history_file()}\n\n"
-        info_text += "各环境安装位置（固定路径）:\n"
-        
+        cm = self.config_manager
+        parts = [
+            f"统一管理文件夹名称: {manager_name}\n",
+            f"完整路径: {manager_path}\n\n",
+            "程序目录结构:\n",
+            f"  • 下载目录: {cm.get_downloads_dir()}\n",
+            f"  • 日志目录: {cm.get_logs_dir()}\n",
+            f"  • 配置目录: {cm.get_config_dir()}\n",
+            f"  • 应用目录: {cm.get_apps_dir()}\n",
+            f"  • 配置文件: {cm.get_config_file()}\n",
+            f"  • 历史记录: {cm.get_history_file()}\n\n",
+            "各环境安装位置（固定路径）:\n",
+        ]
         envs = ["JDK", "Node.js", "Maven", "Redis", "Python"]
-        for env in envs:
-            env_path = self.config_manager.get_env_install_path(env)
-            info_text += f"  • {env}: {env_path}\n"
+        parts.extend(f"  • {env}: {cm.get_env_install_path(env)}\n" for env in envs)
+        info_text = "".join(parts)
         
+        # 内容与文本框当前内容一致时不重写控件
+        if self.current_info_text.get(1.0, "end-1c") == info_text:
+            return
         self.current_info_text.configure(state="normal")
         self.current_info_text.delete(1.0, tk.END)
         self.current_info_text.insert(1.0, info_text)
         self.current_info_text.configure(state="disabled")
 
     def _update_config_ui(self, env):
-        # Clear previous config widgets
-        for widget in self.config_frame.winfo_children():
-            widget.destroy()
-        self.config_widgets = {}
-        
-        # Hide config frame by default, show if needed
-        self.config_frame.grid_remove()
+        """Show the advanced config panel for env.
+
+        Each panel is built on first use and afterwards only re-gridded, so
+        switching environments never destroys and recreates widgets.
+        """
+        for panel, _ in self._config_panels.values():
+            panel.grid_remove()
+        
+        if env not in self._config_panels:
+            panel = ttk.Frame(self.config_frame)
+            self._config_panels[env] = (panel, self._build_config_panel(env, panel))
+        panel, widgets = self._config_panels[env]
+        self.config_widgets = widgets
+        
+        # Hide config frame unless this environment has options
+        if widgets:
+            panel.grid(row=0, column=0, sticky=EW)
+            self.config_frame.grid()
+        else:
+            self.config_frame.grid_remove()
 
+    def _build_config_panel(self, env, parent):
+        """Create env's config widgets inside parent and return {key: tk variable}"""
+        widgets = {}
         if env == "Maven":
-            self.config_frame.grid()
-            ttk.Label(self.config_frame, text="本地仓库路径:").grid(row=0, column=0, sticky=W, pady=5)
+            ttk.Label(parent, text="本地仓库路径:").grid(row=0, column=0, sticky=W, pady=5)
             repo_var = tk.StringVar()
-            entry = ttk.Entry(self.config_frame, textvariable=repo_var, width=40)
+            entry = ttk.Entry(parent, textvariable=repo_var, width=40)
             entry.grid(row=0, column=1, sticky=EW, padx=5)
             
             def _browse_repo():
                 p = filedialog.askdirectory()
                 if p: repo_var.set(p)
             
-            ttk.Button(self.config_frame, text="浏览", command=_browse_repo, bootstyle=SECONDARY).grid(row=0, column=2, padx=5)
-            self.config_widgets['local_repo'] = repo_var
+            ttk.Button(parent, text="浏览", command=_browse_repo, bootstyle=SECONDARY).grid(row=0, column=2, padx=5)
+            widgets['local_repo'] = repo_var
             
         elif env == "Redis":
-            self.config_frame.grid()
-            
             # First row: Port, Username, Password
-            ttk.Label(self.config_frame, text="端口号:").grid(row=0, column=0, sticky=W, pady=5)
+            ttk.Label(parent, text="端口号:").grid(row=0, column=0, sticky=W, pady=5)
             port_var = tk.StringVar(value="6379")
-            ttk.Entry(self.config_frame, textvariable=port_var, width=10).grid(row=0, column=1, sticky=W, padx=5)
-            self.config_widgets['port'] = port_var
+            ttk.Entry(parent, textvariable=port_var, width=10).grid(row=0, column=1, sticky=W, padx=5)
+            widgets['port'] = port_var
             
-            ttk.Label(self.config_frame, text="用户名 (可选):").grid(row=0, column=2, sticky=W, pady=5, padx=(10,0))
+            ttk.Label(parent, text="用户名 (可选):").grid(row=0, column=2, sticky=W, pady=5, padx=(10,0))
             user_var = tk.StringVar()
-            ttk.Entry(self.config_frame, textvariable=user_var, width=15).grid(row=0, column=3, sticky=W, padx=5)
-            self.config_widgets['username'] = user_var
+            ttk.Entry(parent, textvariable=user_var, width=15).grid(row=0, column=3, sticky=W, padx=5)
+            widgets['username'] = user_var
             
-            ttk.Label(self.config_frame, text="密码 (可选):").grid(row=0, column=4, sticky=W, pady=5, padx=(10,0))
+            ttk.Label(parent, text="密码 (可选):").grid(row=0, column=4, sticky=W, pady=5, padx=(10,0))
             pass_var = tk.StringVar()
-            ttk.Entry(self.config_frame, textvariable=pass_var, width=15, show="*").grid(row=0, column=5, sticky=W, padx=5)
-            self.config_widgets['password'] = pass_var
+            ttk.Entry(parent, textvariable=pass_var, width=15, show="*").grid(row=0, column=5, sticky=W, padx=5)
+            widgets['password'] = pass_var
             
             # Service
             service_var = tk.BooleanVar(value=True)
-            ttk.Checkbutton(self.config_frame, text="注册为系统服务 (开机自启)", variable=service_var).grid(row=1, column=0, columnspan=6, sticky=W, pady=5)
-            self.config_widgets['service'] = service_var
+            ttk.Checkbutton(parent, text="注册为系统服务 (开机自启)", variable=service_var).grid(row=1, column=0, columnspan=6, sticky=W, pady=5)
+            widgets['service'] = service_var
+        return widgets
 
     def _load_versions(self, env):
         # Load from specific Installer classes
         self.version_combo.set("Loading...")
         self.version_combo['values'] = []
+        self._versions_req_id += 1
+        req_id = self._versions_req_id
         
         def _fetch_and_update():
             try:
                 versions = []
-                if env == "JDK":
-                    from impl.jdk import JDKInstaller
-                    versions = JDKInstaller().get_version_list()
-                elif env == "Node.js":
-                    from impl.node import NodeInstaller
-                    versions = NodeInstaller().get_version_list()
-                elif env == "Maven":
-                    from impl.maven import MavenInstaller
-                    versions = MavenInstaller().get_version_list()
-                elif env == "Redis":
-                    from impl.redis import RedisInstaller
-                    versions = RedisInstaller().get_version_list()
-                elif env == "Python":
-                    from impl.python import PythonInstaller
-                    versions = PythonInstaller().get_version_list()
+                installer = self._get_installer_instance(env)
+                if installer:
+                    versions = installer.get_version_list()
                 
                 def _update_ui():
+                    # A newer load started while this list was loading
+                    if req_id != self._versions_req_id:
+                        return
                     self.version_combo['values'] = versions
                     if versions:
                         self.version_combo.current(0)
@@ -611,8 +705,12 @@ class MainWindow:
                 self.root.after(0, _update_ui)
             except Exception as e:
                 self.logger.error(f"Failed to load versions: {e}")
-                self.root.after(0, lambda: self.version_combo.set("Error loading versions"))
+                def _show_error():
+                    if req_id == self._versions_req_id:
+                        self.version_combo.set("Error loading versions")
+                self.root.after(0, _show_error)
 
+        # Daemon thread: a slow or offline fetch never keeps the process alive after the window closes
         threading.Thread(target=_fetch_and_update, daemon=True).start()
 
     def _start_action(self):
@@ -646,7 +744,8 @@ class MainWindow:
                         return
 
             self._toggle_ui_state(disabled=True)
-            threading.Thread(target=self._run_task, args=(mode, env, version, path, extra_config), daemon=True).start()
+            # Hand the pre-check instance to the worker instead of constructing a second one
+            threading.Thread(target=self._run_task, args=(mode, env, version, path, extra_config, installer), daemon=True).start()
         
         else: # Uninstall
              if not messagebox.askyesno("确认卸载", f"确定要卸载位于 {path} 的 {env} 吗？\n\n此操作将：\n1. 删除整个目录\n2. 移除相关环境变量\n3. 停止相关服务(如Redis)"):
@@ -664,16 +763,19 @@ class MainWindow:
              self.log_text.delete(1.0, END)
              self.log_text.configure(state="disabled")
 
-    def _run_task(self, mode, env, version, path, extra_config):
+    def _run_task(self, mode, env, version, path, extra_config, installer=None):
         try:
-            installer = self._get_installer_instance(env)
+            if installer is None:
+                installer = self._get_installer_instance(env)
             if not installer:
                 self.logger.warning(f"{env} not yet implemented.")
                 return
 
             if mode == "install":
                 self.logger.info(f"Starting installation of {env} {version} to {path}...")
-                installer.install(version, path, self._update_progress, extra_config=extra_config)
+                # Apply all env var / PATH changes of this install in one registry write + broadcast
+                with installer.sys_config.batch():
+                    installer.install(version, path, self._update_progress, extra_config=extra_config)
                 # Record success history - save the actual installation path
                 # Get actual path from environment variable (which points to the real install location)
                 actual_path = path
@@ -699,7 +801,8 @@ class MainWindow:
                 messagebox.showinfo("完成", f"{env} 安装成功！")
             else:
                 self.logger.info(f"Starting uninstallation of {env} from {path}...")
-                installer.uninstall(path, self._update_progress)
+                with installer.sys_config.batch():
+                    installer.uninstall(path, self._update_progress)
                 # Remove from history
                 self.history_manager.remove_record(path)
                 # Refresh history list
@@ -714,35 +817,56 @@ class MainWindow:
         finally:
             self.root.after(0, lambda: self._toggle_ui_state(disabled=False))
 
+    def _get_installer_cls(self, env):
+        """Return the installer class for env (imported once, then memoized)"""
+        cls = self._installer_cls_cache.get(env)
+        if cls is None:
+            spec = self.INSTALLER_CLASSES.get(env)
+            if spec is None:
+                return None
+            module_name, class_name = spec
+            cls = getattr(importlib.import_module(module_name), class_name)
+            self._installer_cls_cache[env] = cls
+        return cls
+
+    def _prewarm_installers(self):
+        for env in self.INSTALLER_CLASSES:
+            try:
+                self._get_installer_cls(env)
+            except Exception as e:
+                self.logger.warning(f"Failed to load {env} installer: {e}")
+
     def _get_installer_instance(self, env):
-        if env == "JDK":
-            from impl.jdk import JDKInstaller
-            return JDKInstaller()
-        elif env == "Node.js":
-            from impl.node import NodeInstaller
-            return NodeInstaller()
-        elif env == "Maven":
-            from impl.maven import MavenInstaller
-            return MavenInstaller()
-        elif env == "Redis":
-            from impl.redis import RedisInstaller
-            return RedisInstaller()
-        elif env == "Python":
-            from impl.python import PythonInstaller
-            return PythonInstaller()
-        return None
+        cls = self._get_installer_cls(env)
+        return cls() if cls else None
 
     def _update_progress(self, value):
         self.progress_var.set(value)
 
+    # Oldest lines are dropped beyond this to bound the log widget's memory
+    LOG_MAX_LINES = 5000
+
     def append_log(self, message):
-        def _append():
-            self.log_text.configure(state="normal")
-            self.log_text.insert(END, message + "\n")
-            self.log_text.see(END)
-            self.log_text.configure(state="disabled")
-        
-        self.root.after(0, _append)
+        with self._log_lock:
+            self._log_buffer.append(message)
+            if self._log_flush_scheduled:
+                return
+            self._log_flush_scheduled = True
+        self.root.after(50, self._flush_log)
+
+    def _flush_log(self):
+        """Write all buffered log lines with a single insert"""
+        with self._log_lock:
+            lines = list(self._log_buffer)
+            self._log_buffer.clear()
+            self._log_flush_scheduled = False
+        if not lines:
+            return
+        self.log_text.configure(state="normal")
+        self.log_text.insert(END, "\n".join(lines) + "\n")
+        self.log_text.delete(1.0, f"end - {self.LOG_MAX_LINES + 1} lines")
+        self.log_text.see(END)
+        self.log_text.configure(state="disabled")
 
     def run(self):
         self.root.mainloop()
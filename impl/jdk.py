@@ -1,8 +1,12 @@
 import os
 import shutil
 from core.env_manager import EnvironmentManager
+from core.http import SESSION
 
 class JDKInstaller(EnvironmentManager):
+    # Adoptium feature releases only change every few months
+    VERSION_CACHE_TTL = 24 * 3600
+
     def __init__(self):
         super().__init__()
         self.env_var_name = "JAVA_HOME"
@@ -14,12 +18,17 @@ class JDKInstaller(EnvironmentManager):
             "JDK 8 (LTS)": 8
         }
         self.api_url = "https://api.adoptium.net/v3/info/available_releases"
+        self.assets_url = "https://api.adoptium.net/v3/assets/latest/{version}/hotspot"
 
     def get_version_list(self):
+        cached = self.get_cached_versions()
+        if cached:
+            self.versions = cached
+            return list(cached.keys())
+        
         try:
-            import requests
             self.logger.info("Fetching available JDK versions from Adoptium...")
-            response = requests.get(self.api_url, timeout=5)
+            response = SESSION.get(self.api_url, timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -43,6 +52,7 @@ class JDKInstaller(EnvironmentManager):
                 
             if new_versions:
                 self.versions = new_versions
+                self.set_cached_versions(new_versions)
                 return version_keys
                 
         except Exception as e:
@@ -51,6 +61,9 @@ class JDKInstaller(EnvironmentManager):
         return list(self.versions.keys())
 
     def install(self, version_name, install_path, progress_callback=None, extra_config=None):
+        # Versions fetched by another instance (e.g. the UI's version list) come from the shared cache
+        if version_name not in self.versions:
+            self.get_version_list()
         version = self.versions.get(version_name)
         if not version:
             raise ValueError(f"Unknown version: {version_name}")
@@ -61,12 +74,16 @@ class JDKInstaller(EnvironmentManager):
         # https://api.adoptium.net/v3/binary/latest/{feature_version}/ga/windows/x64/jdk/hotspot/normal/eclipse
         url = f"https://api.adoptium.net/v3/binary/latest/{version}/ga/windows/x64/jdk/hotspot/normal/eclipse"
         filename = f"jdk-{version}-windows-x64.zip"
+        # Prefer the direct package link with its published SHA-256
+        package_url, checksum = self._get_package_info(version)
+        if package_url:
+            url = package_url
         
         # 2. Download
         self.logger.info("Step 1/4: Downloading JDK...")
         if progress_callback: progress_callback(10)
         
-        zip_path = self.download_file(url, filename, lambda p: progress_callback(10 + int(p * 0.4))) # 10-50%
+        zip_path = self.download_file(url, filename, lambda p: progress_callback(10 + int(p * 0.4)), sha256=checksum) # 10-50%
         
         # 3. Extract
         self.logger.info("Step 2/4: Extracting files...")
@@ -124,14 +141,23 @@ class JDKInstaller(EnvironmentManager):
         if progress_callback: progress_callback(100)
         self.logger.info(f"JDK {version} installed successfully!")
 
+    def _get_package_info(self, version):
+        """Return (download link, sha256) of the latest GA Windows x64 JDK zip, or (None, None)"""
+        try:
+            params = {"architecture": "x64", "image_type": "jdk", "os": "windows", "vendor": "eclipse"}
+            response = SESSION.get(self.assets_url.format(version=version), params=params, timeout=10)
+            response.raise_for_status()
+            for asset in response.json():
+                package = (asset.get('binary') or {}).get('package') or {}
+                if package.get('link', '').endswith('.zip') and package.get('checksum'):
+                    return package['link'], package['checksum']
+        except Exception as e:
+            self.logger.warning(f"Could not fetch JDK checksum, download will not be verified: {e}")
+        return None, None
+
     def _find_jdk_home(self, root_dir):
-        # Recursively search for bin/javac.exe
-        for root, dirs, files in os.walk(root_dir):
-            if "bin" in dirs:
-                bin_dir = os.path.join(root, "bin")
-                if "javac.exe" in os.listdir(bin_dir) or "java.exe" in os.listdir(bin_dir):
-                    return root
-        return None
+        # Search the top levels for bin/javac.exe (or bin/java.exe)
+        return self.find_home_dir(root_dir, (os.path.join("bin", "javac.exe"), os.path.join("bin", "java.exe")))
 
     def _is_jdk_root(self, path):
         bin_dir = os.path.join(path, "bin")
@@ -152,7 +178,7 @@ class JDKInstaller(EnvironmentManager):
             # If still not found, check JAVA_HOME environment variable
             if not jdk_home:
                 java_home_env = self.sys_config.get_env_variable("JAVA_HOME")
-                if java_home_env and os.path.normpath(java_home_env).startswith(os.path.normpath(install_path)):
+                if java_home_env and self.normalize_path(java_home_env).startswith(self.normalize_path(install_path)):
                     if self._is_jdk_root(java_home_env):
                         jdk_home = java_home_env
                         self.logger.info(f"Found JDK via JAVA_HOME: {jdk_home}")
@@ -166,8 +192,8 @@ class JDKInstaller(EnvironmentManager):
         # Remove Env Vars
         java_home = self.sys_config.get_env_variable("JAVA_HOME")
         if java_home:
-            java_home_normalized = os.path.normpath(java_home)
-            jdk_home_normalized = os.path.normpath(jdk_home)
+            java_home_normalized = self.normalize_path(java_home)
+            jdk_home_normalized = self.normalize_path(jdk_home)
             if java_home_normalized == jdk_home_normalized:
                 self.sys_config.remove_env_variable("JAVA_HOME")
                 self.sys_config.remove_from_path(os.path.join("%JAVA_HOME%", "bin"))
@@ -182,35 +208,7 @@ class JDKInstaller(EnvironmentManager):
         
         # If JDK was in a subdirectory of install_path, try to remove empty parent directories
         if jdk_home != install_path:
-            try:
-                # Walk up from jdk_home to install_path, removing empty directories
-                current_dir = os.path.dirname(jdk_home)
-                install_path_normalized = os.path.normpath(install_path)
-                
-                while current_dir and os.path.normpath(current_dir) != install_path_normalized:
-                    if os.path.exists(current_dir):
-                        try:
-                            if not os.listdir(current_dir):
-                                os.rmdir(current_dir)
-                                self.logger.info(f"Removed empty directory: {current_dir}")
-                                current_dir = os.path.dirname(current_dir)
-                            else:
-                                break  # Directory not empty, stop
-                        except Exception as e:
-                            self.logger.warning(f"Could not remove directory {current_dir}: {e}")
-                            break
-                    else:
-                        break
-                
-                # Also check if install_path itself is now empty
-                if os.path.exists(install_path) and not os.listdir(install_path):
-                    try:
-                        os.rmdir(install_path)
-                        self.logger.info(f"Removed empty install directory: {install_path}")
-                    except Exception as e:
-                        self.logger.warning(f"Could not remove install directory: {e}")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up parent directories: {e}")
+            self.remove_empty_parents(jdk_home, install_path)
         
         if progress_callback: progress_callback(100)
         self.logger.info("JDK uninstalled successfully.")
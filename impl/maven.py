@@ -1,4 +1,5 @@
 import os
+import xml.etree.ElementTree as ET
 from core.env_manager import EnvironmentManager
 
 class MavenInstaller(EnvironmentManager):
@@ -98,34 +99,62 @@ class MavenInstaller(EnvironmentManager):
             
         try:
             self.logger.info(f"Configuring local repository: {local_repo}")
-            with open(settings_path, 'r', encoding='utf-8') as f:
+            # Parse instead of matching text: the stock settings.xml carries a sample
+            # <localRepository> inside a comment, and its root element has a namespace.
+            # Comments inside <settings> are kept so the file stays self-documenting.
+            # ElementTree drops everything before the root element, so the XML
+            # declaration and Apache license header are copied back verbatim.
+            with open(settings_path, "r", encoding="utf-8-sig") as f:
                 content = f.read()
+            prolog_end = self._root_start(content)
+            parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
+            parser.feed(content)
+            root = parser.close()
+            ns = root.tag[1:].split("}")[0] if root.tag.startswith("{") else ""
+            tag = f"{{{ns}}}localRepository" if ns else "localRepository"
             
-            import re
-            # Insert <localRepository> after <settings ...>
-            # Use regex to find the opening <settings> tag which might have attributes
-            if "<localRepository>" not in content:
-                new_content = re.sub(
-                    r'(<settings.*?>)', 
-                    f'\\1\n  <!-- Configured by DevEnvInstaller -->\n  <localRepository>{local_repo}</localRepository>', 
-                    content, 
-                    count=1
-                )
-                
-                # Fallback if regex didn't match (unlikely)
-                if new_content == content:
-                    new_content = content.replace('<settings>', f'<settings>\n  <localRepository>{local_repo}</localRepository>', 1)
-
-                with open(settings_path, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-            else:
-                 # If it exists (unlikely for fresh install), we might want to replace it?
-                 # For now, let's assume fresh install.
-                 pass
+            local_repo_elem = root.find(tag)
+            if local_repo_elem is None:
+                indent = "\n  "
+                comment = ET.Comment(" Configured by DevEnvInstaller ")
+                comment.tail = indent
+                local_repo_elem = ET.Element(tag)
+                local_repo_elem.tail = root.text or indent
+                root.text = indent
+                root.insert(0, comment)
+                root.insert(1, local_repo_elem)
+            local_repo_elem.text = local_repo
+            
+            if ns:
+                # Serialize the Maven namespace as the default one rather than ns0:
+                ET.register_namespace("", ns)
+            with open(settings_path, "w", encoding="utf-8") as f:
+                f.write(content[:prolog_end])
+                f.write(ET.tostring(root, encoding="unicode"))
+                f.write("\n")
                  
         except Exception as e:
             self.logger.error(f"Failed to update settings.xml: {e}")
 
+    @staticmethod
+    def _root_start(content):
+        """Return the offset of the root start tag, skipping the XML declaration and comments"""
+        pos = 0
+        while True:
+            pos = content.find("<", pos)
+            if pos < 0:
+                return 0
+            if content.startswith("<?", pos):
+                pos = content.find("?>", pos) + 2
+            elif content.startswith("<!--", pos):
+                pos = content.find("-->", pos) + 3
+            elif content.startswith("<!", pos):
+                pos = content.find(">", pos) + 1
+            else:
+                return pos
+            if pos < 3:
+                return 0
+
     def uninstall(self, install_path, progress_callback=None):
         # First, try to find the actual Maven root directory
         maven_home = None
@@ -136,15 +165,12 @@ class MavenInstaller(EnvironmentManager):
         else:
             # Try to find Maven in subdirectories (common case after extraction)
             self.logger.info(f"Path {install_path} is not Maven root, searching for Maven in subdirectories...")
-            for root, dirs, files in os.walk(install_path):
-                if "bin" in dirs and os.path.exists(os.path.join(root, "bin", "mvn.cmd")):
-                    maven_home = root
-                    break
+            maven_home = self.find_home_dir(install_path, (os.path.join("bin", "mvn.cmd"),))
             
             # If still not found, check MAVEN_HOME environment variable
             if not maven_home:
                 maven_home_env = self.sys_config.get_env_variable("MAVEN_HOME")
-                if maven_home_env and os.path.normpath(maven_home_env).startswith(os.path.normpath(install_path)):
+                if maven_home_env and self.normalize_path(maven_home_env).startswith(self.normalize_path(install_path)):
                     if os.path.exists(os.path.join(maven_home_env, "bin", "mvn.cmd")):
                         maven_home = maven_home_env
                         self.logger.info(f"Found Maven via MAVEN_HOME: {maven_home}")
@@ -157,8 +183,8 @@ class MavenInstaller(EnvironmentManager):
 
         maven_home_env = self.sys_config.get_env_variable("MAVEN_HOME")
         if maven_home_env:
-            maven_home_env_normalized = os.path.normpath(maven_home_env)
-            maven_home_normalized = os.path.normpath(maven_home)
+            maven_home_env_normalized = self.normalize_path(maven_home_env)
+            maven_home_normalized = self.normalize_path(maven_home)
             if maven_home_env_normalized == maven_home_normalized:
                 self.sys_config.remove_env_variable("MAVEN_HOME")
                 self.sys_config.remove_env_variable("M2_HOME") # Also remove M2_HOME
@@ -172,33 +198,7 @@ class MavenInstaller(EnvironmentManager):
         
         # If Maven was in a subdirectory of install_path, try to remove empty parent directories
         if maven_home != install_path:
-            try:
-                current_dir = os.path.dirname(maven_home)
-                install_path_normalized = os.path.normpath(install_path)
-                
-                while current_dir and os.path.normpath(current_dir) != install_path_normalized:
-                    if os.path.exists(current_dir):
-                        try:
-                            if not os.listdir(current_dir):
-                                os.rmdir(current_dir)
-                                self.logger.info(f"Removed empty directory: {current_dir}")
-                                current_dir = os.path.dirname(current_dir)
-                            else:
-                                break
-                        except Exception as e:
-                            self.logger.warning(f"Could not remove directory {current_dir}: {e}")
-                            break
-                    else:
-                        break
-                
-                if os.path.exists(install_path) and not os.listdir(install_path):
-                    try:
-                        os.rmdir(install_path)
-                        self.logger.info(f"Removed empty install directory: {install_path}")
-                    except Exception as e:
-                        self.logger.warning(f"Could not remove install directory: {e}")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up parent directories: {e}")
+            self.remove_empty_parents(maven_home, install_path)
         
         if progress_callback: progress_callback(100)
         self.logger.info("Maven uninstalled successfully.")
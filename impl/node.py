@@ -1,7 +1,7 @@
 import os
 import json
-import requests
 from core.env_manager import EnvironmentManager
+from core.http import SESSION
 
 class NodeInstaller(EnvironmentManager):
     def __init__(self):
@@ -12,10 +12,15 @@ class NodeInstaller(EnvironmentManager):
 
     def get_version_list(self):
         """Fetch remote LTS versions from nodejs.org"""
+        cached = self.get_cached_versions()
+        if cached:
+            self.versions = cached
+            return list(cached.keys())[:10]
+        
         try:
             self.logger.info("Fetching Node.js version list...")
             # Use a short timeout to not block UI too long, handle exception if offline
-            response = requests.get(self.node_dist_url, timeout=5)
+            response = SESSION.get(self.node_dist_url, timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -35,6 +40,9 @@ class NodeInstaller(EnvironmentManager):
                         "files": item.get('files', [])
                     }
             
+            if self.versions:
+                # Only the newest 10 are offered in the UI, so only those are cached
+                self.set_cached_versions(dict(list(self.versions.items())[:10]))
             # Return top 10 recent LTS versions to avoid a huge list
             return list(self.versions.keys())[:10]
             
@@ -142,7 +150,7 @@ class NodeInstaller(EnvironmentManager):
             # If still not found, check NODE_HOME environment variable
             if not node_home:
                 node_home_env = self.sys_config.get_env_variable("NODE_HOME")
-                if node_home_env and os.path.normpath(node_home_env).startswith(os.path.normpath(install_path)):
+                if node_home_env and self.normalize_path(node_home_env).startswith(self.normalize_path(install_path)):
                     if os.path.exists(os.path.join(node_home_env, "node.exe")):
                         node_home = node_home_env
                         self.logger.info(f"Found Node.js via NODE_HOME: {node_home}")
@@ -155,8 +163,8 @@ class NodeInstaller(EnvironmentManager):
 
         node_home_env = self.sys_config.get_env_variable("NODE_HOME")
         if node_home_env:
-            node_home_env_normalized = os.path.normpath(node_home_env)
-            node_home_normalized = os.path.normpath(node_home)
+            node_home_env_normalized = self.normalize_path(node_home_env)
+            node_home_normalized = self.normalize_path(node_home)
             if node_home_env_normalized == node_home_normalized:
                 self.sys_config.remove_env_variable("NODE_HOME")
         
@@ -169,33 +177,7 @@ class NodeInstaller(EnvironmentManager):
         
         # If Node.js was in a subdirectory of install_path, try to remove empty parent directories
         if node_home != install_path:
-            try:
-                current_dir = os.path.dirname(node_home)
-                install_path_normalized = os.path.normpath(install_path)
-                
-                while current_dir and os.path.normpath(current_dir) != install_path_normalized:
-                    if os.path.exists(current_dir):
-                        try:
-                            if not os.listdir(current_dir):
-                                os.rmdir(current_dir)
-                                self.logger.info(f"Removed empty directory: {current_dir}")
-                                current_dir = os.path.dirname(current_dir)
-                            else:
-                                break
-                        except Exception as e:
-                            self.logger.warning(f"Could not remove directory {current_dir}: {e}")
-                            break
-                    else:
-                        break
-                
-                if os.path.exists(install_path) and not os.listdir(install_path):
-                    try:
-                        os.rmdir(install_path)
-                        self.logger.info(f"Removed empty install directory: {install_path}")
-                    except Exception as e:
-                        self.logger.warning(f"Could not remove install directory: {e}")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up parent directories: {e}")
+            self.remove_empty_parents(node_home, install_path)
         
         if progress_callback: progress_callback(100)
         self.logger.info("Node.js uninstalled successfully.")
@@ -1,6 +1,7 @@
 import os
 import sys
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from core.env_manager import EnvironmentManager
 
 class PythonInstaller(EnvironmentManager):
@@ -48,34 +49,38 @@ class PythonInstaller(EnvironmentManager):
         
         self.logger.info(f"Preparing to install Python {version}...")
 
-        # 1. Download Python Embed Zip
-        self.logger.info("Step 1/5: Downloading Python...")
-        if progress_callback: progress_callback(10)
-        
-        zip_path = self.download_file(url, filename, lambda p: progress_callback(10 + int(p * 0.2))) # 10-30%
-        
-        # 2. Extract
-        self.logger.info("Step 2/5: Extracting files...")
-        if progress_callback: progress_callback(30)
-        
-        python_home = os.path.join(install_path, f"Python-{version}")
-        if not os.path.exists(python_home):
-            os.makedirs(python_home)
+        # get-pip.py does not depend on the Python archive, so fetch it in the
+        # background while the archive is downloaded and extracted
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            get_pip_future = pool.submit(self.download_file, self.get_pip_url, "get-pip.py")
+
+            # 1. Download Python Embed Zip
+            self.logger.info("Step 1/5: Downloading Python...")
+            if progress_callback: progress_callback(10)
             
-        self.extract_zip(zip_path, python_home, lambda p: progress_callback(30 + int(p * 0.2))) # 30-50%
-        
-        # 3. Configure .pth file to allow pip/site-packages
-        # By default, embeddable python ignores site-packages unless we modify python3xx._pth
-        self.logger.info("Step 3/5: Configuring Python environment...")
-        if progress_callback: progress_callback(50)
-        
-        self._enable_site_packages(python_home, version)
-        
-        # 4. Install pip
-        self.logger.info("Step 4/5: Installing pip...")
-        if progress_callback: progress_callback(60)
-        
-        self._install_pip(python_home, lambda p: progress_callback(60 + int(p * 0.2))) # 60-80%
+            zip_path = self.download_file(url, filename, lambda p: progress_callback(10 + int(p * 0.2))) # 10-30%
+            
+            # 2. Extract
+            self.logger.info("Step 2/5: Extracting files...")
+            if progress_callback: progress_callback(30)
+            
+            python_home = os.path.join(install_path, f"Python-{version}")
+            os.makedirs(python_home, exist_ok=True)
+                
+            self.extract_zip(zip_path, python_home, lambda p: progress_callback(30 + int(p * 0.2))) # 30-50%
+            
+            # 3. Configure .pth file to allow pip/site-packages
+            # By default, embeddable python ignores site-packages unless we modify python3xx._pth
+            self.logger.info("Step 3/5: Configuring Python environment...")
+            if progress_callback: progress_callback(50)
+            
+            self._enable_site_packages(python_home, version)
+            
+            # 4. Install pip
+            self.logger.info("Step 4/5: Installing pip...")
+            if progress_callback: progress_callback(60)
+            
+            self._install_pip(python_home, get_pip_future.result())
         
         # 5. Configure Environment
         self.logger.info("Step 5/5: Updating PATH...")
@@ -123,10 +128,8 @@ class PythonInstaller(EnvironmentManager):
         else:
             self.logger.warning(f"Could not find .pth file at {pth_file}")
 
-    def _install_pip(self, python_home, progress_callback=None):
-        """Download get-pip.py and run it"""
-        get_pip_path = self.download_file(self.get_pip_url, "get-pip.py", progress_callback)
-        
+    def _install_pip(self, python_home, get_pip_path):
+        """Run the downloaded get-pip.py with the embedded interpreter"""
         python_exe = os.path.join(python_home, "python.exe")
         if not os.path.exists(python_exe):
             raise Exception("python.exe not found")
@@ -182,7 +185,7 @@ class PythonInstaller(EnvironmentManager):
             # If still not found, check PYTHON_HOME environment variable
             if not python_home:
                 python_home_env = self.sys_config.get_env_variable("PYTHON_HOME")
-                if python_home_env and os.path.normpath(python_home_env).startswith(os.path.normpath(install_path)):
+                if python_home_env and self.normalize_path(python_home_env).startswith(self.normalize_path(install_path)):
                     if os.path.exists(python_home_env):
                         python_home = python_home_env
                         self.logger.info(f"Found Python via PYTHON_HOME: {python_home}")
@@ -195,8 +198,8 @@ class PythonInstaller(EnvironmentManager):
 
         python_home_env = self.sys_config.get_env_variable("PYTHON_HOME")
         if python_home_env:
-            python_home_env_normalized = os.path.normpath(python_home_env)
-            python_home_normalized = os.path.normpath(python_home)
+            python_home_env_normalized = self.normalize_path(python_home_env)
+            python_home_normalized = self.normalize_path(python_home)
             if python_home_env_normalized == python_home_normalized:
                 self.sys_config.remove_env_variable("PYTHON_HOME")
         
@@ -210,33 +213,7 @@ class PythonInstaller(EnvironmentManager):
         
         # If Python was in a subdirectory of install_path, try to remove empty parent directories
         if python_home != install_path:
-            try:
-                current_dir = os.path.dirname(python_home)
-                install_path_normalized = os.path.normpath(install_path)
-                
-                while current_dir and os.path.normpath(current_dir) != install_path_normalized:
-                    if os.path.exists(current_dir):
-                        try:
-                            if not os.listdir(current_dir):
-                                os.rmdir(current_dir)
-                                self.logger.info(f"Removed empty directory: {current_dir}")
-                                current_dir = os.path.dirname(current_dir)
-                            else:
-                                break
-                        except Exception as e:
-                            self.logger.warning(f"Could not remove directory {current_dir}: {e}")
-                            break
-                    else:
-                        break
-                
-                if os.path.exists(install_path) and not os.listdir(install_path):
-                    try:
-                        os.rmdir(install_path)
-                        self.logger.info(f"Removed empty install directory: {install_path}")
-                    except Exception as e:
-                        self.logger.warning(f"Could not remove install directory: {e}")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up parent directories: {e}")
+            self.remove_empty_parents(python_home, install_path)
         
         if progress_callback: progress_callback(100)
         self.logger.info("Python uninstalled successfully.")
@@ -62,8 +62,7 @@ class RedisInstaller(EnvironmentManager):
         # We want "D:\Softwares\Redis-5.0.14".
         
         redis_home = os.path.join(install_path, f"Redis-{version}")
-        if not os.path.exists(redis_home):
-            os.makedirs(redis_home)
+        os.makedirs(redis_home, exist_ok=True)
             
         # Extract directly to redis_home
         self.extract_zip(zip_path, redis_home, lambda p: progress_callback(50 + int(p * 0.2)))
@@ -191,7 +190,7 @@ class RedisInstaller(EnvironmentManager):
             # If still not found, check REDIS_HOME environment variable
             if not redis_home:
                 redis_home_env = self.sys_config.get_env_variable("REDIS_HOME")
-                if redis_home_env and os.path.normpath(redis_home_env).startswith(os.path.normpath(install_path)):
+                if redis_home_env and self.normalize_path(redis_home_env).startswith(self.normalize_path(install_path)):
                     if os.path.exists(os.path.join(redis_home_env, "redis-server.exe")):
                         redis_home = redis_home_env
                         self.logger.info(f"Found Redis via REDIS_HOME: {redis_home}")
@@ -209,8 +208,8 @@ class RedisInstaller(EnvironmentManager):
 
         redis_home_env = self.sys_config.get_env_variable("REDIS_HOME")
         if redis_home_env:
-            redis_home_env_normalized = os.path.normpath(redis_home_env)
-            redis_home_normalized = os.path.normpath(redis_home)
+            redis_home_env_normalized = self.normalize_path(redis_home_env)
+            redis_home_normalized = self.normalize_path(redis_home)
             if redis_home_env_normalized == redis_home_normalized:
                 self.sys_config.remove_env_variable("REDIS_HOME")
         
@@ -223,33 +222,7 @@ class RedisInstaller(EnvironmentManager):
         
         # If Redis was in a subdirectory of install_path, try to remove empty parent directories
         if redis_home != install_path:
-            try:
-                current_dir = os.path.dirname(redis_home)
-                install_path_normalized = os.path.normpath(install_path)
-                
-                while current_dir and os.path.normpath(current_dir) != install_path_normalized:
-                    if os.path.exists(current_dir):
-                        try:
-                            if not os.listdir(current_dir):
-                                os.rmdir(current_dir)
-                                self.logger.info(f"Removed empty directory: {current_dir}")
-                                current_dir = os.path.dirname(current_dir)
-                            else:
-                                break
-                        except Exception as e:
-                            self.logger.warning(f"Could not remove directory {current_dir}: {e}")
-                            break
-                    else:
-                        break
-                
-                if os.path.exists(install_path) and not os.listdir(install_path):
-                    try:
-                        os.rmdir(install_path)
-                        self.logger.info(f"Removed empty install directory: {install_path}")
-                    except Exception as e:
-                        self.logger.warning(f"Could not remove install directory: {e}")
-            except Exception as e:
-                self.logger.warning(f"Error cleaning up parent directories: {e}")
+            self.remove_empty_parents(redis_home, install_path)
         
         if progress_callback: progress_callback(100)
         self.logger.info("Redis uninstalled successfully.")
@@ -1,6 +1,5 @@
 import sys
 import os
-from gui.main_window import MainWindow
 
 # Explicit imports for PyInstaller to detect dynamic imports
 # These are not used directly but ensure modules are included in the bundle
@@ -12,8 +11,16 @@ if False:  # Never executed, but PyInstaller will scan these
     from impl.python import PythonInstaller
     from core.env_manager import EnvironmentManager
     from core.history import HistoryManager
+    from core.update_runner import apply_update
+    from gui.main_window import MainWindow
 
 def main():
+    # Self-update mode: started by the previous version to swap the exe, no GUI
+    if len(sys.argv) == 5 and sys.argv[1] == "--apply-update":
+        from core.update_runner import main as apply_update
+        sys.exit(apply_update(sys.argv[2:]))
+    
+    from gui.main_window import MainWindow
     app = MainWindow()
     app.run()
 